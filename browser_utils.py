@@ -1,9 +1,64 @@
-import platform, subprocess, re
+import json, logging, os, platform, shutil, subprocess, re, time
+from typing import Any, Callable, Dict, List, Optional
 try:
     import winreg
 except ImportError:
     winreg = None
 
+from config import (
+    BLOCK_RESOURCES,
+    BROWSER_CACHE_DIR,
+    BROWSER_WARM_PROFILE,
+    BROWSER_TEMPLATE_TTL_HOURS,
+    CHROME_VERSION_FALLBACK,
+)
+
+CHROME_BINARIES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"]
+PROBE_CACHE_FILE = "chrome_probe.json"
+PROFILE_TEMPLATE_DIR = "profile-template"
+# Per-session state and anything that carries a Google identity (cookies,
+# site storage, logins) must not be cloned into a new profile; the template
+# keeps prefs only and consent is re-set per launch (see preset_consent).
+PROFILE_SKIP = (
+    "Cache", "Code Cache", "GPUCache", "GrShaderCache", "ShaderCache", "DawnCache",
+    "Service Worker", "Crashpad", "Crash Reports", "SingletonLock", "SingletonSocket",
+    "SingletonCookie", "BrowserMetrics", "Cookies*", "Login Data*", "Web Data*", "History*",
+    "Local Storage", "Session Storage", "IndexedDB", "Sessions", "Network Persistent State",
+    "Trust Tokens*", "Safe Browsing*",
+)
+
+_probe_memo: Dict[str, Any] = {}
+
+# URL patterns for Network.setBlockedURLs ("*" wildcards). Blocking a request
+# leaves the DOM alone, so <img src> values are still readable; only the bytes
+# are never downloaded.
+BLOCK_GROUPS: Dict[str, List[str]] = {
+    "tiles": [
+        "*/maps/vt?*", "*/maps/vt/*", "*/kh/v=*", "*khms*.google.com/*", "*/maps/api/js/StaticMapService*",
+        "*streetviewpixels-pa.googleapis.com/*", "*/maps/preview/tactile*",
+    ],
+    "images": [
+        "*.googleusercontent.com/*", "*.ggpht.com/*", "*.gstatic.com/*.png*", "*.gstatic.com/*.jpg*",
+        "*.gstatic.com/*.gif*", "*.gstatic.com/*.webp*", "*.gstatic.com/*.svg*", "*.ico",
+    ],
+    "fonts": ["*fonts.gstatic.com/*", "*fonts.googleapis.com/*", "*.woff", "*.woff2", "*.ttf"],
+    "telemetry": [
+        "*/gen_204*", "*/log?*", "*play.google.com/log*", "*/csi?*", "*google-analytics.com/*",
+        "*googletagmanager.com/*", "*doubleclick.net/*", "*/maps/preview/log204*",
+    ],
+    "reviews": ["*/maps/rpc/listugcposts*", "*/maps/preview/review/*"],
+    "photo-meta": ["*/maps/preview/photo*", "*/maps/rpc/photo/*"],
+}
+
+# Per-stage profiles. The detail panel keeps photo metadata so the carousel
+# still renders its <img> tags (DETAIL_PHOTOS_IMG_XP reads their src).
+BLOCK_PROFILES: Dict[str, List[str]] = {
+    "scraper-list": ["tiles", "images", "fonts", "telemetry", "reviews", "photo-meta"],
+    "scraper-detail": ["tiles", "images", "fonts", "telemetry", "reviews"],
+    "enricher": ["tiles", "images", "fonts", "telemetry", "reviews", "photo-meta"],
+}
+
+
 def get_installed_chrome_major():
     # Windows detection
     if platform.system().lower() == "windows" and winreg:
@@ -15,7 +70,7 @@ def get_installed_chrome_major():
             except Exception:
                 continue
     # Linux/macOS detection
-    for cmd in ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"]:
+    for cmd in CHROME_BINARIES:
         try:
             output = subprocess.check_output([cmd, "--version"], stderr=subprocess.STDOUT, text=True)
             match = re.search(r"(\d+)\.", output)
@@ -24,3 +79,217 @@ def get_installed_chrome_major():
         except Exception:
             continue
     return None
+
+
+def _chrome_binary() -> Optional[str]:
+    for cmd in CHROME_BINARIES:
+        path = shutil.which(cmd)
+        if path:
+            return os.path.realpath(path)
+    return None
+
+
+def _cache_dir() -> str:
+    os.makedirs(BROWSER_CACHE_DIR, exist_ok=True)
+    return BROWSER_CACHE_DIR
+
+
+def chrome_major(probe: Callable[[], Optional[int]] = get_installed_chrome_major) -> Optional[int]:
+    """Installed Chrome major version, probed once per host and binary.
+
+    The result is kept in memory and in ``BROWSER_CACHE_DIR``; it is re-probed
+    only when the host name or the Chrome binary (path or mtime) changes.
+    """
+    binary = _chrome_binary()
+    stamp = {"host": platform.node(), "binary": binary,
+             "mtime": int(os.path.getmtime(binary)) if binary else None}
+    key = json.dumps(stamp, sort_keys=True)
+    if key in _probe_memo:
+        return _probe_memo[key]
+
+    path = os.path.join(_cache_dir(), PROBE_CACHE_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("stamp") == stamp:
+            _probe_memo[key] = cached.get("major")
+            return _probe_memo[key]
+    except (OSError, ValueError):
+        pass
+
+    major = probe()
+    _probe_memo[key] = major
+    try:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"stamp": stamp, "major": major}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logging.debug("Could not persist Chrome probe: %s", e)
+    return major
+
+
+def patched_chromedriver(version_main: Optional[int]) -> Optional[str]:
+    """Path to a chromedriver patched once and reused by every launch.
+
+    Copies the chromedriver found on PATH into the cache dir and patches the
+    copy with undetected-chromedriver's Patcher; uc sees an already patched
+    binary and skips its per-launch copy + patch. The copy is patched under a
+    temporary name and moved into place, so concurrent workers never run a
+    half-patched file. Returns None (uc's default download path) when there
+    is no local chromedriver or patching fails.
+    """
+    source = shutil.which("chromedriver")
+    if not source:
+        return None
+    source = os.path.realpath(source)
+    target = os.path.join(_cache_dir(), f"chromedriver-{version_main or 'any'}-patched")
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+        return target
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        from undetected_chromedriver.patcher import Patcher
+
+        shutil.copy2(source, tmp)
+        Patcher(executable_path=tmp, version_main=version_main or 0).auto()
+        os.replace(tmp, target)
+        logging.info("Patched chromedriver cached at %s", target)
+        return target
+    except Exception as e:
+        logging.warning("Could not pre-patch chromedriver (%s); uc will patch per launch", e)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return None
+
+
+def profile_template_path() -> str:
+    return os.path.join(_cache_dir(), PROFILE_TEMPLATE_DIR)
+
+
+def _template_fresh(template: str) -> bool:
+    try:
+        age = time.time() - os.path.getmtime(template)
+    except OSError:
+        return False
+    return not BROWSER_TEMPLATE_TTL_HOURS or age < BROWSER_TEMPLATE_TTL_HOURS * 3600
+
+
+def seed_profile(profile_dir: str) -> bool:
+    """Fill an empty ``profile_dir`` from the warm template, if one exists and has not expired."""
+    template = profile_template_path()
+    if not BROWSER_WARM_PROFILE or not os.path.isdir(template) or not _template_fresh(template):
+        return False
+    try:
+        shutil.copytree(template, profile_dir, dirs_exist_ok=True)
+        return True
+    except (OSError, shutil.Error) as e:
+        logging.debug("Could not seed profile %s: %s", profile_dir, e)
+        return False
+
+
+def save_profile_template(profile_dir: Optional[str]) -> bool:
+    """Keep a used profile's prefs as the template for later launches.
+
+    Writes when no template exists or the current one is older than
+    BROWSER_TEMPLATE_TTL_HOURS. Cookies, site storage, caches and lock files
+    are left out (PROFILE_SKIP). Call it after the browser using
+    ``profile_dir`` has quit.
+    """
+    template = profile_template_path()
+    if not BROWSER_WARM_PROFILE or not profile_dir or not os.path.isdir(profile_dir):
+        return False
+    if os.path.isdir(template) and _template_fresh(template):
+        return False
+    tmp = f"{template}.{os.getpid()}.tmp"
+    old = f"{template}.{os.getpid()}.old"
+    try:
+        shutil.copytree(profile_dir, tmp, ignore=shutil.ignore_patterns(*PROFILE_SKIP), symlinks=True)
+        if os.path.isdir(template):
+            os.replace(template, old)
+        os.replace(tmp, template)
+        logging.info("Saved warm browser profile template to %s", template)
+        return True
+    except OSError as e:
+        logging.debug("Could not save profile template: %s", e)
+        shutil.rmtree(tmp, ignore_errors=True)
+        return False
+    finally:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def preset_consent(driver) -> bool:
+    """Pre-accept the Google consent wall for this browser without copying anyone's cookies."""
+    try:
+        driver.execute_cdp_cmd("Network.setCookie", {
+            "name": "CONSENT", "value": "YES+cb", "domain": ".google.com", "path": "/", "secure": True,
+        })
+        return True
+    except Exception as e:
+        logging.debug("Could not preset consent cookie: %s", e)
+        return False
+
+
+def launch_chrome(build_opts: Callable[[], Any], profile_dir: Optional[str] = None, label: str = "browser"):
+    """Start undetected Chrome via the cached version probe, pre-patched driver and warm profile."""
+    import undetected_chromedriver as uc
+
+    started = time.time()
+    version_main = chrome_major() or CHROME_VERSION_FALLBACK or 124
+    driver_path = patched_chromedriver(version_main)
+    seeded = seed_profile(profile_dir) if profile_dir else False
+
+    kwargs: Dict[str, Any] = {"version_main": version_main, "use_subprocess": True}
+    if driver_path:
+        kwargs["driver_executable_path"] = driver_path
+    if profile_dir:
+        kwargs["user_data_dir"] = profile_dir
+
+    driver = None
+    for attempt in (1, 2):
+        try:
+            driver = uc.Chrome(options=build_opts(), **kwargs)
+            break
+        except Exception as e:
+            logging.warning("Browser launch attempt %d failed: %s", attempt, e)
+            if attempt == 2:
+                raise
+            # A stale pre-patched binary is the usual culprit; let uc patch its own.
+            kwargs.pop("driver_executable_path", None)
+    if seeded:
+        preset_consent(driver)
+
+    logging.info("%s ready in %.1fs (chrome %s, %s driver, %s profile)", label.capitalize(),
+                 time.time() - started, version_main, "cached" if driver_path else "uc-patched",
+                 "warm" if seeded else "fresh")
+    return driver
+
+
+def block_patterns(profile: str) -> List[str]:
+    return [pat for group in BLOCK_PROFILES[profile] for pat in BLOCK_GROUPS[group]]
+
+
+def block_resources(driver, profile: str, target: Optional[str] = None) -> bool:
+    """Switch ``driver`` to the request-blocking ``profile``; no-op if already active.
+
+    CDP commands go to the current tab, so callers juggling several tabs pass
+    that tab's handle as ``target`` (None is the driver's main tab). Returns
+    False when blocking is disabled or CDP is unavailable.
+    """
+    if not BLOCK_RESOURCES:
+        return False
+    active = getattr(driver, "_block_profiles", None)
+    if active is None:
+        active = driver._block_profiles = {}
+    if active.get(target) == profile:
+        return True
+    try:
+        if target not in active:
+            driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": block_patterns(profile)})
+        active[target] = profile
+        return True
+    except Exception as e:
+        logging.debug("Resource blocking (%s) unavailable: %s", profile, e)
+        return False
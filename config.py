@@ -1,4 +1,4 @@
-import os, re, platform
+import os
 
 PAGELOAD_TIMEOUT = 30
 SCRIPT_TIMEOUT = 20
@@ -7,20 +7,19 @@ SCROLL_BATCH_MIN = 4
 SCROLL_BATCH_MAX = 8
 SCROLL_DELAY_MIN = 0.25
 SCROLL_DELAY_MAX = 0.65
+DETAIL_PHOTO_WAIT_MS = 1500
+SCROLL_MODE = "observer"
+SCROLL_MIN_INTERVAL = 1.2
+SCROLL_WAIT_TIMEOUT_MS = 6000
+# Stop scrolling after this many batches in a row with < SCROLL_MIN_YIELD unseen places (0 disables).
+SCROLL_MIN_YIELD = 0.15
+SCROLL_LOW_YIELD_ROUNDS = 3
+HARVEST_STREAMING = False
+DETAIL_TABS = 0
+DETAIL_TAB_TIMEOUT = 15
 HEADLESS_DEFAULT = True
 CHROME_VERSION_FALLBACK = None
 
-def get_chrome_major_runtime():
-    try:
-        if platform.system().lower() == "linux":
-            out = os.popen("google-chrome --version").read().strip()
-            m = re.search(r"(\d+)\.", out)
-            if m:
-                return int(m.group(1))
-        return None
-    except Exception:
-        return None
-
 CSV_FIELDS = [
     "category",
     "query_location",
@@ -37,12 +36,43 @@ CSV_FIELDS = [
     "social_links",
     "photo_urls",
     "timestamp",
+    "phone_verified_at",
 ]
 
 DEFAULT_MAX_PLACES = 120
-BROWSER_RESTART_EVERY = 5
+SCRAPER_WORKERS = 1
+SCRAPER_ENGINE = "dom"
+CSV_FLUSH_EVERY = 25
+CSV_FLUSH_SECS = 10
+GEO_TILE_GRID = 0
+GEO_TILE_SPLIT_AT = 100
+GEO_TILE_MAX_DEPTH = 2
+GEO_TILE_MAX_JOBS = 40
+KNOWN_PLACES_INDEX = ""
+# Safety ceilings only: BrowserPool recycles on memory, errors or failed probes first.
+BROWSER_RESTART_EVERY = 20
 PHONE_ENRICH_LIMIT = 2000
-PHONE_RESTART_EVERY = 100
+# Verified phones older than this are checked again by the enricher (0 = never).
+PHONE_REVERIFY_TTL_DAYS = 90
+ENRICH_CONCURRENCY = 1
+ENRICH_MAX_TRIES = 3
+# Quiet period after the place panel renders before concluding it has no phone.
+PHONE_SETTLE_MS = 800
+# Browserless phone lookup (scraper/http_phone.py); Chrome only handles its misses.
+HTTP_PHONE_FAST_PATH = True
+HTTP_PHONE_TIMEOUT = 10
+HTTP_PHONE_MAX_BLOCKS = 5
+PHONE_RESTART_EVERY = 500
+BROWSER_MAX_RSS_MB = 1500
+BROWSER_MAX_ERRORS = 3
+BROWSER_SPARE = True
+# Chrome version probe, pre-patched chromedriver and warm profile template live here.
+BROWSER_CACHE_DIR = os.environ.get("LEAD_SIGNAL_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "lead-signal"))
+BROWSER_WARM_PROFILE = True
+# Rebuild the warm profile template after this long so no profile state outlives a day.
+BROWSER_TEMPLATE_TTL_HOURS = 24
+# Block tiles, image bytes, fonts and telemetry via CDP (see browser_utils.BLOCK_PROFILES).
+BLOCK_RESOURCES = True
 SUPABASE_TABLE_NAME = "production_maps"
 SUPABASE_BATCH_SIZE = 2000
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
@@ -51,6 +81,40 @@ SCRAPER_JITTER_MIN = 0.4
 SCRAPER_JITTER_MAX = 1.0
 ENRICH_JITTER_MIN = 0.2
 ENRICH_JITTER_MAX = 0.5
+PACING_MIN_SCALE = 0.3
+PACING_MAX_SCALE = 4.0
+PACING_DECREASE_STEP = 0.05
+PACING_BACKOFF = 2.0
+PACING_SLOW_SECS = 12.0
+PACING_LOG_EVERY = 25
+# Circuit breaker for captcha / consent walls (scraper.page_state.CircuitBreaker).
+BLOCK_TRIP_AFTER = 2
+BLOCK_EMPTY_STREAK = 6
+BLOCK_MAX_TRIPS = 3
+BLOCK_PAUSE_SECS = 90
+EXIT_BLOCKED = 3
+PROXY_FILE = ""
+TRACE_FILE = ""
+PROXY_COOLDOWN_SECS = 300
+PROXY_QUARANTINE_AFTER = 3
+# Job scheduler (scheduler.py): ranks (location, category) combos by value/cost.
+SCHED_STATS_DB = "scrape_stats.sqlite"
+SCHED_BUDGET_MIN = 180
+SCHED_MAX_LOCATIONS = 3
+SCHED_PRIOR_NEW = 40
+SCHED_PRIOR_SECS = 300
+SCHED_REFRESH_DAYS = 30
+SCHED_DEMAND_WEIGHT = 25.0
+SCHED_DEMAND_DAYS = 30
+# Fixed per-location cost: browser start, first search, clean and push.
+SCHED_LOCATION_OVERHEAD_SECS = 300
+# pipeline.py phone-checks each location's new places after the scrape; budget for it per expected place.
+SCHED_ENRICH_SECS_PER_PLACE = 3.0
+# Shared job queue (db/job_queue.py): Postgres URL or SQLite path; empty = no queue.
+JOB_QUEUE_URL = os.environ.get("LEAD_SIGNAL_QUEUE", "")
+JOB_LEASE_SECS = 900
+JOB_MAX_ATTEMPTS = 3
+JOB_LEASE_BATCH = 8
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Leased (location, category) job queue shared by any number of scrape workers.
+
+A worker ``lease``s queued jobs for ``ttl`` seconds, keeps them alive with
+``heartbeat`` while it scrapes, then marks each one ``complete`` or
+``release``s it back to the queue. A lease that is not renewed expires and
+the job becomes leasable again, so a crashed runner's work is picked up by
+the next ``lease`` call. Times are epoch seconds taken from the database
+clock, so workers on different machines agree on expiry.
+
+``open_queue`` picks the backend from the URL: ``postgres://``/
+``postgresql://`` for the shared production queue (psycopg2), anything else
+is a local SQLite file.
+"""
+import argparse, logging, sqlite3, sys, threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import LOG_FORMAT, LOG_LEVEL, JOB_LEASE_SECS, JOB_MAX_ATTEMPTS
+
+JobSpec = Union[Tuple[str, str], Tuple[str, str, float]]
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS scrape_jobs ("
+    " id {serial} PRIMARY KEY,"
+    " location TEXT NOT NULL,"
+    " category TEXT NOT NULL,"
+    " priority DOUBLE PRECISION NOT NULL DEFAULT 0,"
+    " status TEXT NOT NULL DEFAULT 'queued',"
+    " owner TEXT,"
+    " attempts INTEGER NOT NULL DEFAULT 0,"
+    " lease_until DOUBLE PRECISION,"
+    " heartbeat_at DOUBLE PRECISION,"
+    " new_places INTEGER,"
+    " secs DOUBLE PRECISION,"
+    " last_error TEXT,"
+    " created_at DOUBLE PRECISION NOT NULL,"
+    " updated_at DOUBLE PRECISION NOT NULL)",
+    # One open job per combo; finished ones can be queued again later.
+    "CREATE UNIQUE INDEX IF NOT EXISTS scrape_jobs_open_combo ON scrape_jobs (location, category)"
+    " WHERE status IN ('queued', 'leased')",
+    "CREATE INDEX IF NOT EXISTS scrape_jobs_leasable ON scrape_jobs (status, priority)",
+]
+
+
+@dataclass
+class Job:
+    id: int
+    location: str
+    category: str
+    attempts: int
+
+
+class JobQueue:
+    """Backend-neutral queue logic; subclasses provide the connection and SQL dialect."""
+
+    PH = "?"
+    NOW = ""
+    SERIAL = ""
+    LOCK = ""
+
+    def __init__(self, conn, url: str, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self._db = conn
+        self.url = url
+        self.max_attempts = max_attempts
+        for stmt in SCHEMA:
+            self._exec(stmt.format(serial=self.SERIAL))
+        self._db.commit()
+
+    def _exec(self, sql: str, params: Sequence = ()):
+        cur = self._db.cursor()
+        cur.execute(sql.replace("{now}", self.NOW).replace("?", self.PH), tuple(params))
+        return cur
+
+    def _begin(self) -> None:
+        pass
+
+    def enqueue(self, jobs: Iterable[JobSpec]) -> int:
+        """Queue (location, category[, priority]) jobs; combos already queued or leased are skipped."""
+        added = 0
+        for spec in jobs:
+            loc, cat = spec[0], spec[1]
+            prio = float(spec[2]) if len(spec) > 2 else 0.0
+            cur = self._exec(
+                "INSERT INTO scrape_jobs (location, category, priority, status, attempts, created_at, updated_at)"
+                " VALUES (?, ?, ?, 'queued', 0, {now}, {now}) ON CONFLICT DO NOTHING",
+                (loc, cat, prio),
+            )
+            added += max(cur.rowcount, 0)
+        self._db.commit()
+        return added
+
+    def lease(self, owner: str, limit: int = 1, ttl: float = JOB_LEASE_SECS,
+              location: Optional[str] = None) -> List[Job]:
+        """Take up to ``limit`` of the highest-priority leasable jobs (optionally for one ``location``)."""
+        self._begin()
+        try:
+            # Expired leases that already used every attempt are given up on.
+            self._exec(
+                "UPDATE scrape_jobs SET status = 'failed', owner = NULL, updated_at = {now},"
+                " last_error = COALESCE(last_error, 'lease expired') WHERE status = 'leased'"
+                " AND lease_until < {now} AND attempts >= ?",
+                (self.max_attempts,),
+            )
+            where = "(status = 'queued' OR (status = 'leased' AND lease_until < {now})) AND attempts < ?"
+            params: List = [self.max_attempts]
+            if location is not None:
+                where += " AND location = ?"
+                params.append(location)
+            rows = self._exec(
+                f"SELECT id, location, category, attempts, status FROM scrape_jobs WHERE {where}"
+                f" ORDER BY priority DESC, id LIMIT ?{self.LOCK}",
+                params + [limit],
+            ).fetchall()
+            jobs = []
+            for job_id, loc, cat, attempts, status in rows:
+                if status == "leased":
+                    logging.info("Job queue: reclaiming expired lease on #%d %s | %s", job_id, loc, cat)
+                self._exec(
+                    "UPDATE scrape_jobs SET status = 'leased', owner = ?, attempts = attempts + 1,"
+                    " lease_until = {now} + ?, heartbeat_at = {now}, updated_at = {now} WHERE id = ?",
+                    (owner, ttl, job_id),
+                )
+                jobs.append(Job(job_id, loc, cat, attempts + 1))
+            self._db.commit()
+            return jobs
+        except Exception:
+            self._db.rollback()
+            raise
+
+    def heartbeat(self, owner: str, job_ids: Sequence[int], ttl: float = JOB_LEASE_SECS) -> int:
+        """Extend ``owner``'s leases; returns how many are still held."""
+        if not job_ids:
+            return 0
+        marks = ",".join("?" * len(job_ids))
+        cur = self._exec(
+            f"UPDATE scrape_jobs SET lease_until = {{now}} + ?, heartbeat_at = {{now}}, updated_at = {{now}}"
+            f" WHERE owner = ? AND status = 'leased' AND id IN ({marks})",
+            [ttl, owner, *job_ids],
+        )
+        self._db.commit()
+        return cur.rowcount
+
+    def complete(self, job_id: int, owner: str, new_places: int = 0, secs: float = 0.0) -> bool:
+        cur = self._exec(
+            "UPDATE scrape_jobs SET status = 'done', owner = NULL, lease_until = NULL, new_places = ?, secs = ?,"
+            " updated_at = {now} WHERE id = ? AND owner = ? AND status = 'leased'",
+            (int(new_places), float(secs), job_id, owner),
+        )
+        self._db.commit()
+        return cur.rowcount == 1
+
+    def release(self, job_id: int, owner: str, error: str = "") -> bool:
+        """Hand a leased job back: queued again, or failed once its attempts are used up."""
+        cur = self._exec(
+            "UPDATE scrape_jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,"
+            " owner = NULL, lease_until = NULL, last_error = ?, updated_at = {now}"
+            " WHERE id = ? AND owner = ? AND status = 'leased'",
+            (self.max_attempts, error or None, job_id, owner),
+        )
+        self._db.commit()
+        return cur.rowcount == 1
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._exec("SELECT status, COUNT(*) FROM scrape_jobs GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class SqliteJobQueue(JobQueue):
+    NOW = "((julianday('now') - 2440587.5) * 86400.0)"
+    SERIAL = "INTEGER"
+
+    def __init__(self, path: str, max_attempts: int = JOB_MAX_ATTEMPTS):
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        super().__init__(_SqliteConn(conn), path, max_attempts)
+
+    def _begin(self) -> None:
+        # Take the write lock before reading candidates so two local workers never pick the same row.
+        self._db.begin_immediate()
+
+
+class _SqliteConn:
+    """Autocommit sqlite3 connection with explicit transactions (commit/rollback are no-ops outside one)."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def cursor(self):
+        return self._conn.cursor()
+
+    def begin_immediate(self) -> None:
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def commit(self) -> None:
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+
+    def rollback(self) -> None:
+        if self._conn.in_transaction:
+            self._conn.execute("ROLLBACK")
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class PostgresJobQueue(JobQueue):
+    PH = "%s"
+    NOW = "extract(epoch from clock_timestamp())"
+    SERIAL = "BIGSERIAL"
+    # Concurrent workers skip rows another transaction is leasing instead of waiting on them.
+    LOCK = " FOR UPDATE SKIP LOCKED"
+
+    def __init__(self, url: str, max_attempts: int = JOB_MAX_ATTEMPTS):
+        import psycopg2
+
+        super().__init__(psycopg2.connect(url), url, max_attempts)
+
+
+def open_queue(url: str, max_attempts: int = JOB_MAX_ATTEMPTS) -> JobQueue:
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresJobQueue(url, max_attempts)
+    return SqliteJobQueue(url[len("sqlite:///"):] if url.startswith("sqlite:///") else url, max_attempts)
+
+
+class LeaseKeeper:
+    """Background heartbeat for a set of leased jobs, on its own connection.
+
+    Use as a context manager around the work; ``lost`` is set once a beat
+    finds fewer leases than it was given (they expired and were reclaimed).
+    """
+
+    def __init__(self, url: str, owner: str, job_ids: Sequence[int], ttl: float = JOB_LEASE_SECS):
+        self.url = url
+        self.owner = owner
+        self.job_ids = list(job_ids)
+        self.ttl = ttl
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-keeper", daemon=True)
+
+    def _run(self) -> None:
+        q = open_queue(self.url)
+        try:
+            while not self._stop.wait(self.ttl / 3.0):
+                try:
+                    held = q.heartbeat(self.owner, self.job_ids, self.ttl)
+                except Exception as e:
+                    logging.warning("Job queue: heartbeat failed: %s", e)
+                    continue
+                if held < len(self.job_ids) and not self.lost:
+                    self.lost = True
+                    logging.warning("Job queue: %s lost %d of %d leases", self.owner,
+                                    len(self.job_ids) - held, len(self.job_ids))
+        finally:
+            q.close()
+
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect or fill the scrape job queue")
+    ap.add_argument("--queue", required=True, help="Postgres URL or SQLite path")
+    ap.add_argument("--enqueue", nargs=2, metavar=("CITIES_FILE", "CATEGORIES_FILE"),
+                    help="Queue every city x category combo")
+    ap.add_argument("--log", default=LOG_LEVEL)
+    args = ap.parse_args()
+
+    level = getattr(logging, args.log.upper(), getattr(logging, LOG_LEVEL, logging.INFO))
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=sys.stdout)
+
+    q = open_queue(args.queue)
+    try:
+        if args.enqueue:
+            lists = []
+            for path in args.enqueue:
+                with open(path, "r", encoding="utf-8") as f:
+                    lists.append([ln.strip() for ln in f if ln.strip() and not ln.lstrip().startswith("#")])
+            added = q.enqueue((loc, cat) for loc in lists[0] for cat in lists[1])
+            logging.info("Queued %d new jobs", added)
+        logging.info("Job queue: %s", ", ".join(f"{k}={v}" for k, v in sorted(q.counts().items())) or "empty")
+    finally:
+        q.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -20,9 +20,13 @@ create table if not exists public.production_maps (
   rating          numeric,
   opening_hours   text,
   social_links    text,
-  phone_verified  boolean not null default false
+  phone_verified  boolean not null default false,
+  phone_verified_at timestamptz
 );
 
+-- Added after launch; the enricher re-checks phones older than PHONE_REVERIFY_TTL_DAYS.
+alter table public.production_maps add column if not exists phone_verified_at timestamptz;
+
 -- Index for fast phone enrichment queries (unverified rows)
 create index if not exists idx_production_maps_phone_verified
   on public.production_maps (phone_verified)
@@ -37,6 +41,32 @@ create table if not exists public.lead_requests (
   created_at timestamptz default now()
 );
 
+-- Leased scrape jobs shared by pipeline.py --queue workers (db/job_queue.py).
+-- Times are epoch seconds from the database clock.
+create table if not exists public.scrape_jobs (
+  id            bigserial primary key,
+  location      text not null,
+  category      text not null,
+  priority      double precision not null default 0,
+  status        text not null default 'queued',  -- queued | leased | done | failed
+  owner         text,
+  attempts      integer not null default 0,
+  lease_until   double precision,
+  heartbeat_at  double precision,
+  new_places    integer,
+  secs          double precision,
+  last_error    text,
+  created_at    double precision not null,
+  updated_at    double precision not null
+);
+
+create unique index if not exists scrape_jobs_open_combo
+  on public.scrape_jobs (location, category)
+  where status in ('queued', 'leased');
+
+create index if not exists scrape_jobs_leasable
+  on public.scrape_jobs (status, priority);
+
 create table if not exists public.sitemap_cache (
   id           integer primary key default 1,
   body         text,
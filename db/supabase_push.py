@@ -57,8 +57,10 @@ def clean_row(row: Dict[str, Any]) -> Dict[str, Any]:
     r["opening_hours"] = (row.get("opening_hours") or "").strip()
     r["social_links"] = (row.get("social_links") or "").strip()
     r["rating"] = to_float(row.get("rating"))
+    verified_at = (row.get("phone_verified_at") or "").strip()
     verified = to_bool(row.get("phone_verified"))
-    r["phone_verified"] = verified if verified is not None else False
+    r["phone_verified"] = verified if verified is not None else bool(verified_at)
+    r["phone_verified_at"] = verified_at or None
     return r
 
 
@@ -1,37 +1,54 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import argparse, sys, subprocess, logging
+import argparse, json, os, shutil, socket, sys, subprocess, logging, tempfile
 from pathlib import Path
 
 from config import (
     DEFAULT_MAX_PLACES,
+    SCRAPER_WORKERS,
+    KNOWN_PLACES_INDEX,
+    PROXY_FILE,
     PHONE_ENRICH_LIMIT,
+    ENRICH_CONCURRENCY,
+    JOB_QUEUE_URL,
+    JOB_LEASE_BATCH,
+    EXIT_BLOCKED,
     LOG_FORMAT,
     LOG_LEVEL,
 )
 
 
-def run(cmd, allow_fail=False):
+def run(cmd, allow_fail=False, ok_codes=(0,)):
     logging.info("Running: %s", " ".join(cmd))
     result = subprocess.run(cmd)
-    if result.returncode != 0:
+    if result.returncode not in ok_codes:
         logging.error("Command failed with code %d", result.returncode)
         if not allow_fail:
             sys.exit(result.returncode)
+    return result.returncode
 
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--location", required=True)
+    ap.add_argument("--location")
     ap.add_argument("--categories-file", default="categories.txt")
     ap.add_argument("--max-places", type=int, default=DEFAULT_MAX_PLACES)
     ap.add_argument("--out-prefix", default="run")
+    ap.add_argument("--workers", type=int, default=SCRAPER_WORKERS)
+    ap.add_argument("--known-index", default=KNOWN_PLACES_INDEX)
+    ap.add_argument("--proxy-file", default=PROXY_FILE)
+    ap.add_argument("--stats-out", default="", help="Per-category yield JSON for scheduler.py record")
     ap.add_argument("--no-headless", action="store_true")
     ap.add_argument("--phone-limit", type=int, default=PHONE_ENRICH_LIMIT)
+    ap.add_argument("--enrich-concurrency", type=int, default=ENRICH_CONCURRENCY, help="Phone enricher browsers")
     ap.add_argument("--skip-scrape", action="store_true")
     ap.add_argument("--skip-clean", action="store_true")
     ap.add_argument("--skip-enrich", action="store_true")
     ap.add_argument("--skip-push", action="store_true")
+    ap.add_argument("--queue", default=JOB_QUEUE_URL, help="Pull (location, category) jobs from this queue")
+    ap.add_argument("--worker-id", default="", help="Lease owner name (default: host-pid)")
+    ap.add_argument("--lease-batch", type=int, default=JOB_LEASE_BATCH, help="Categories leased per location")
+    ap.add_argument("--stats-dir", default="", help="Queue mode: keep each batch's stats JSON here for scheduler.py record")
     ap.add_argument("--log", default=LOG_LEVEL)
     args = ap.parse_args()
 
@@ -42,27 +59,48 @@ def main():
         stream=sys.stdout,
     )
 
+    if args.location:
+        run_location(args, args.location, args.categories_file, args.out_prefix, args.stats_out)
+    elif args.queue:
+        work_queue(args)
+    else:
+        ap.error("--location or --queue is required")
+
+
+def run_location(args, location: str, categories_file: str, out_prefix: str, stats_out: str = "") -> bool:
+    """Scrape, clean, enrich and push one location; returns True if the scraper hit a block."""
     base = Path(".")
-    raw_csv = str(base / f"{args.out_prefix}_raw.csv")
-    cleaned_csv = str(base / f"{args.out_prefix}_cleaned.csv")
-    enriched_csv = str(base / f"{args.out_prefix}_enriched.csv")
+    raw_csv = str(base / f"{out_prefix}_raw.csv")
+    cleaned_csv = str(base / f"{out_prefix}_cleaned.csv")
+    enriched_csv = str(base / f"{out_prefix}_enriched.csv")
 
+    blocked = False
     if not args.skip_scrape:
         cmd = [
             sys.executable,
             "scraper/maps_scraper.py",
             "--categories-file",
-            args.categories_file,
+            categories_file,
             "--location",
-            args.location,
+            location,
             "--max-places",
             str(args.max_places),
             "--output",
             raw_csv,
+            "--workers",
+            str(args.workers),
         ]
+        if args.known_index:
+            cmd += ["--known-index", args.known_index]
+        if args.proxy_file:
+            cmd += ["--proxy-file", args.proxy_file]
+        if stats_out:
+            cmd += ["--stats-out", stats_out]
         if not args.no_headless:
             cmd.append("--headless")
-        run(cmd, allow_fail=False)
+        blocked = run(cmd, allow_fail=False, ok_codes=(0, EXIT_BLOCKED)) == EXIT_BLOCKED
+        if blocked:
+            logging.warning("Scraper stopped early on a blocked runner; continuing with the rows it saved")
 
     if not args.skip_clean:
         cmd = [
@@ -75,7 +113,13 @@ def main():
         ]
         run(cmd, allow_fail=False)
 
-    if not args.skip_enrich:
+    if blocked and not args.skip_enrich:
+        # The enricher visits the same Maps pages from the same runner.
+        logging.warning("Skipping phone enrichment for this blocked run; pushing unenriched rows")
+        push_csv = cleaned_csv
+    else:
+        push_csv = enriched_csv
+    if not args.skip_enrich and not blocked:
         cmd = [
             sys.executable,
             "scraper/phone_enricher.py",
@@ -85,16 +129,89 @@ def main():
             enriched_csv,
             "--limit",
             str(args.phone_limit),
+            "--concurrency",
+            str(args.enrich_concurrency),
         ]
+        if args.proxy_file:
+            cmd += ["--proxy-file", args.proxy_file]
         run(cmd, allow_fail=False)
 
     if not args.skip_push:
         cmd = [
             sys.executable,
             "db/supabase_push.py",
-            enriched_csv,
+            push_csv,
         ]
         run(cmd, allow_fail=False)
+    return blocked
+
+
+def work_queue(args) -> None:
+    """Worker mode: lease jobs for one location at a time until the queue is drained.
+
+    Each batch runs through ``run_location`` under its own output prefix, so
+    later steps only see that batch's rows and a released category is
+    scraped afresh by whoever leases it next. When the run finished cleanly
+    every category is completed, with new=0 if it found nothing; otherwise
+    only the categories in its stats are, and the rest go back to the queue
+    for another worker. A blocked runner stops leasing so a healthier one
+    can take over.
+    """
+    from db.job_queue import LeaseKeeper, open_queue
+
+    owner = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    q = open_queue(args.queue)
+    workdir = Path(tempfile.mkdtemp(prefix="lead-signal-jobs-"))
+    if args.stats_dir:
+        os.makedirs(args.stats_dir, exist_ok=True)
+    batch_no = 0
+    try:
+        while True:
+            jobs = q.lease(owner, limit=1)
+            if not jobs:
+                logging.info("Job queue drained | %s", q.counts())
+                break
+            jobs += q.lease(owner, limit=max(0, args.lease_batch - 1), location=jobs[0].location)
+            location = jobs[0].location
+            batch_no += 1
+            categories_file = str(workdir / f"categories_{batch_no}.txt")
+            stats_file = str(Path(args.stats_dir or workdir) / f"stats_q{batch_no}.json")
+            with open(categories_file, "w", encoding="utf-8") as f:
+                f.write("\n".join(j.category for j in jobs) + "\n")
+            logging.info("Leased %d jobs for %s as %s", len(jobs), location, owner)
+
+            error, blocked = "", False
+            with LeaseKeeper(args.queue, owner, [j.id for j in jobs]) as keeper:
+                try:
+                    safe = "".join(c if c.isalnum() else "_" for c in location)
+                    blocked = run_location(args, location, categories_file, f"{args.out_prefix}_{safe}_{batch_no}",
+                                           stats_file)
+                except SystemExit as e:
+                    # run() exits on a failed step; keep the worker alive and hand the jobs back.
+                    error = f"pipeline step exited with {e.code}"
+
+            if keeper.lost:
+                # Expired leases were handed to another worker; its outcome is the one that counts.
+                logging.warning("Lost the lease on %s jobs; leaving them to their new owner", location)
+                jobs = []
+            stats = {}
+            if jobs and os.path.exists(stats_file):
+                with open(stats_file, "r", encoding="utf-8") as f:
+                    stats = json.load(f).get("categories") or {}
+            for j in jobs:
+                st = stats.get(j.category)
+                if st is None and not error and not blocked:
+                    st = {"new": 0, "secs": 0.0}  # the run finished; the category simply found nothing
+                if st is not None and not error:
+                    q.complete(j.id, owner, st.get("new", 0), st.get("secs", 0.0))
+                else:
+                    q.release(j.id, owner, error or ("blocked" if blocked else "not finished"))
+            if blocked:
+                logging.warning("Runner is blocked; leaving the remaining jobs to other workers")
+                break
+    finally:
+        q.close()
+        shutil.rmtree(workdir, ignore_errors=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Pick which (location, category) jobs to scrape next.
+
+``plan`` ranks every combo of cities.txt x categories.txt (plus any combo
+users asked for in ``lead_requests``) by expected value per runner-second
+and keeps the best set that fits the time budget. ``record`` folds a
+scraper ``--stats-out`` file back into the stats database so the next plan
+knows what each combo yielded and cost.
+"""
+import argparse, json, logging, os, sqlite3, sys, time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import (
+    LOG_FORMAT,
+    LOG_LEVEL,
+    SCHED_STATS_DB,
+    SCHED_BUDGET_MIN,
+    SCHED_MAX_LOCATIONS,
+    SCHED_PRIOR_NEW,
+    SCHED_PRIOR_SECS,
+    SCHED_REFRESH_DAYS,
+    SCHED_DEMAND_WEIGHT,
+    SCHED_DEMAND_DAYS,
+    SCHED_LOCATION_OVERHEAD_SECS,
+    SCHED_ENRICH_SECS_PER_PLACE,
+)
+
+DAY = 86400.0
+
+
+def read_list(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [ln.strip() for ln in f if ln.strip() and not ln.lstrip().startswith("#")]
+
+
+def _key(s: str) -> str:
+    return " ".join((s or "").lower().split())
+
+
+class JobStats:
+    """SQLite store of per-(location, category) outcomes, smoothed with an EWMA."""
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS job_stats ("
+            " location TEXT NOT NULL, category TEXT NOT NULL, runs INTEGER NOT NULL,"
+            " last_run REAL NOT NULL, last_new INTEGER NOT NULL, ewma_new REAL NOT NULL, ewma_secs REAL NOT NULL,"
+            " PRIMARY KEY (location, category))"
+        )
+        self._db.commit()
+
+    def get(self, location: str, category: str) -> Optional[Dict[str, float]]:
+        row = self._db.execute(
+            "SELECT runs, last_run, last_new, ewma_new, ewma_secs FROM job_stats WHERE location = ? AND category = ?",
+            (_key(location), _key(category)),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("runs", "last_run", "last_new", "ewma_new", "ewma_secs"), row))
+
+    def record(self, location: str, category: str, new: int, secs: float, when: Optional[float] = None,
+               alpha: float = 0.5) -> None:
+        when = when or time.time()
+        prev = self.get(location, category)
+        if prev is None:
+            ewma_new, ewma_secs, runs = float(new), float(secs), 1
+        else:
+            ewma_new = alpha * new + (1 - alpha) * prev["ewma_new"]
+            ewma_secs = alpha * secs + (1 - alpha) * prev["ewma_secs"]
+            runs = prev["runs"] + 1
+        self._db.execute(
+            "INSERT OR REPLACE INTO job_stats (location, category, runs, last_run, last_new, ewma_new, ewma_secs)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (_key(location), _key(category), runs, when, int(new), ewma_new, ewma_secs),
+        )
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.commit()
+        self._db.close()
+
+
+@dataclass
+class Job:
+    location: str
+    category: str
+    value: float
+    secs: float
+    demand: int = 0
+    reason: str = ""
+
+    @property
+    def density(self) -> float:
+        return self.value / max(self.secs, 1.0)
+
+
+@dataclass
+class Plan:
+    jobs: List[Job] = field(default_factory=list)
+    secs: float = 0.0
+
+    def by_location(self) -> Dict[str, List[str]]:
+        out: Dict[str, List[str]] = {}
+        for j in self.jobs:
+            out.setdefault(j.location, []).append(j.category)
+        return out
+
+
+def score_job(location: str, category: str, stats: Optional[Dict[str, float]], demand: int,
+              now: float) -> Job:
+    """Expected new leads for a combo, discounted by how recently it was covered.
+
+    The cost is the scrape time plus the phone enrichment those new places
+    will need, since pipeline.py runs both within the same budget.
+    """
+    if stats is None:
+        expected, secs, staleness, reason = SCHED_PRIOR_NEW, SCHED_PRIOR_SECS, 1.0, "never scraped"
+    else:
+        age_days = (now - stats["last_run"]) / DAY
+        # A combo that just came back empty refills slowly; SCHED_REFRESH_DAYS
+        # is when it counts as fully stale again.
+        staleness = min(1.0, age_days / SCHED_REFRESH_DAYS) if SCHED_REFRESH_DAYS > 0 else 1.0
+        expected = max(stats["ewma_new"], 1.0)
+        secs = max(stats["ewma_secs"], 30.0)
+        reason = f"yield~{stats['ewma_new']:.0f} age={age_days:.0f}d"
+    value = expected * staleness + SCHED_DEMAND_WEIGHT * demand
+    secs += expected * staleness * SCHED_ENRICH_SECS_PER_PLACE
+    if demand:
+        reason += f" demand={demand}"
+    return Job(location, category, value, secs, demand, reason)
+
+
+def plan_jobs(locations: Iterable[str], categories: Iterable[str], stats: JobStats,
+              demand: Dict[Tuple[str, str], int], budget_secs: float, max_locations: int = SCHED_MAX_LOCATIONS,
+              now: Optional[float] = None, names: Optional[Dict[str, str]] = None) -> Plan:
+    """Greedy value-per-second selection under ``budget_secs``.
+
+    Each new location adds SCHED_LOCATION_OVERHEAD_SECS (browser start, first
+    search, clean, push) and at most ``max_locations`` are opened per run.
+    Requested combos outside the configured lists are scheduled too, spelled
+    as the request spelled them (``names``, see ``demand_names``).
+    """
+    names = names or {}
+    now = now or time.time()
+    locations = list(dict.fromkeys(locations))
+    categories = list(dict.fromkeys(categories))
+    combos = {(_key(l), _key(c)): (l, c) for l in locations for c in categories}
+    for (loc, cat) in demand:
+        if loc and cat and (loc, cat) not in combos:
+            combos[(loc, cat)] = (names.get(loc, loc), names.get(cat, cat))
+
+    candidates = []
+    for (lk, ck), (loc, cat) in combos.items():
+        candidates.append(score_job(loc, cat, stats.get(loc, cat), demand.get((lk, ck), 0), now))
+    candidates.sort(key=lambda j: (-j.density, -j.value))
+
+    plan = Plan()
+    opened: Dict[str, bool] = {}
+    for job in candidates:
+        lk = _key(job.location)
+        cost = job.secs + (0 if lk in opened else SCHED_LOCATION_OVERHEAD_SECS)
+        if lk not in opened and len(opened) >= max_locations:
+            continue
+        if plan.secs + cost > budget_secs:
+            continue
+        opened[lk] = True
+        plan.jobs.append(job)
+        plan.secs += cost
+    return plan
+
+
+def demand_from_rows(rows: Iterable[Dict[str, str]], locations: List[str],
+                     categories: List[str]) -> Dict[Tuple[str, str], int]:
+    """Count requests per combo; a request naming only a location (or category) counts for all its combos."""
+    demand: Dict[Tuple[str, str], int] = {}
+    for r in rows:
+        loc, cat = _key(r.get("location", "")), _key(r.get("category", ""))
+        locs = [loc] if loc else [_key(l) for l in locations]
+        cats = [cat] if cat else [_key(c) for c in categories]
+        if not loc and not cat:
+            continue
+        for lk in locs:
+            for ck in cats:
+                demand[(lk, ck)] = demand.get((lk, ck), 0) + 1
+    return demand
+
+
+def demand_names(rows: Iterable[Dict[str, str]]) -> Dict[str, str]:
+    """Original spelling of each requested location and category, by normalized key."""
+    names: Dict[str, str] = {}
+    for r in rows:
+        for col in ("location", "category"):
+            v = " ".join((r.get(col) or "").split())
+            if v:
+                names.setdefault(_key(v), v)
+    return names
+
+
+def fetch_lead_requests(days: int = SCHED_DEMAND_DAYS) -> List[Dict[str, str]]:
+    from supabase import create_client
+
+    url = os.environ.get("SUPABASE_URL", "").strip()
+    key = os.environ.get("SUPABASE_SERVICE_ROLE", "").strip()
+    if not url or not key:
+        raise RuntimeError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE")
+    since = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - days * DAY))
+    res = create_client(url, key).table("lead_requests").select("location,category").gte("created_at", since).execute()
+    return res.data or []
+
+
+def cmd_plan(args) -> None:
+    locations = read_list(args.cities)
+    categories = read_list(args.categories)
+    rows: List[Dict[str, str]] = []
+    if args.demand:
+        try:
+            rows = fetch_lead_requests()
+        except Exception as e:
+            logging.warning("Could not load lead_requests (%s); planning without demand", e)
+    stats = JobStats(args.stats)
+    try:
+        plan = plan_jobs(locations, categories, stats, demand_from_rows(rows, locations, categories),
+                         args.budget_min * 60.0, max_locations=args.max_locations, names=demand_names(rows))
+    finally:
+        stats.close()
+    for j in plan.jobs:
+        logging.info("Plan: %-28s | %-26s value=%.1f est=%.0fs (%s)", j.location, j.category, j.value, j.secs, j.reason)
+    logging.info("Planned %d jobs over %d locations, ~%.0f min of %d min budget",
+                 len(plan.jobs), len(plan.by_location()), plan.secs / 60.0, args.budget_min)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    manifest = []
+    for i, (loc, cats) in enumerate(plan.by_location().items()):
+        path = os.path.join(args.out_dir, f"categories_{i}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(cats) + "\n")
+        manifest.append({"location": loc, "categories_file": path})
+    with open(os.path.join(args.out_dir, "plan.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    if args.queue:
+        from db.job_queue import open_queue
+
+        q = open_queue(args.queue)
+        try:
+            added = q.enqueue((j.location, j.category, j.value) for j in plan.jobs)
+            logging.info("Queued %d of %d planned jobs (others already open) | %s", added, len(plan.jobs), q.counts())
+        finally:
+            q.close()
+
+
+def cmd_record(args) -> None:
+    stats = JobStats(args.stats)
+    try:
+        for path in args.run_stats:
+            if not os.path.exists(path):
+                logging.warning("No run stats at %s", path)
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            cats = dict(data.get("categories") or {})
+            if not data.get("blocked"):
+                # A scheduled combo with no entry came back empty; without an
+                # observation it would keep the never-scraped prior forever.
+                for cat in data.get("scheduled") or []:
+                    cats.setdefault(cat, {"new": 0, "secs": 0.0})
+            for cat, st in cats.items():
+                stats.record(data["location"], cat, int(st.get("new", 0)), float(st.get("secs", 0.0)))
+            logging.info("Recorded %d categories for %s from %s", len(cats), data.get("location"), path)
+        stats.commit()
+    finally:
+        stats.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Priority scheduler for (location, category) scrape jobs")
+    ap.add_argument("--stats", default=SCHED_STATS_DB, help="SQLite job stats path")
+    ap.add_argument("--log", default=LOG_LEVEL)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("plan", help="Choose this run's jobs")
+    p.add_argument("--cities", default="cities.txt")
+    p.add_argument("--categories", default="categories.txt")
+    p.add_argument("--budget-min", type=int, default=SCHED_BUDGET_MIN)
+    p.add_argument("--max-locations", type=int, default=SCHED_MAX_LOCATIONS)
+    p.add_argument("--demand", action="store_true", help="Weight combos by Supabase lead_requests")
+    p.add_argument("--out-dir", default="plan")
+    p.add_argument("--queue", default="", help="Also enqueue the plan into this job queue (see db/job_queue.py)")
+    r = sub.add_parser("record", help="Fold scraper --stats-out files into the stats DB")
+    r.add_argument("run_stats", nargs="+")
+    args = ap.parse_args()
+
+    level = getattr(logging, args.log.upper(), getattr(logging, LOG_LEVEL, logging.INFO))
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=sys.stdout)
+    if args.cmd == "plan":
+        cmd_plan(args)
+    else:
+        cmd_record(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import logging, os, sys, threading, time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import BROWSER_MAX_RSS_MB, BROWSER_MAX_ERRORS, BROWSER_SPARE
+
+
+def _children(pid: int) -> List[int]:
+    kids: List[int] = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                kids.extend(int(x) for x in f.read().split())
+    except OSError:
+        pass
+    return kids
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for ln in f:
+                if ln.startswith("VmRSS:"):
+                    return int(ln.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def process_tree_rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of ``pid`` and all its descendants, or None without /proc."""
+    if not pid or not os.path.exists(f"/proc/{pid}"):
+        return None
+    total, stack, seen = 0, [pid], set()
+    while stack:
+        p = stack.pop()
+        if p in seen:
+            continue
+        seen.add(p)
+        total += _rss_kb(p)
+        stack.extend(_children(p))
+    return total / 1024.0
+
+
+def driver_rss_mb(driver) -> Optional[float]:
+    pid = getattr(driver, "browser_pid", None)
+    if not pid:
+        service = getattr(driver, "service", None)
+        pid = getattr(getattr(service, "process", None), "pid", None)
+    return process_tree_rss_mb(pid) if pid else None
+
+
+class Lease:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.errors = 0
+        self.broken = False
+        try:
+            driver._lead_lease = self  # lets code that only holds the driver report errors
+        except AttributeError:
+            pass
+
+    def record_error(self) -> None:
+        self.errors += 1
+
+    def discard(self) -> None:
+        """Mark the driver unusable; the pool replaces it at check-in."""
+        self.broken = True
+
+
+def record_driver_error(driver) -> None:
+    """Count a handled failure against the lease ``driver`` belongs to, if any."""
+    lease = getattr(driver, "_lead_lease", None)
+    if lease is not None:
+        lease.record_error()
+
+
+class BrowserPool:
+    """Hands out one healthy driver at a time and recycles it on evidence, not on a timer.
+
+    A driver is replaced when it fails the check-out probe, when Chrome's
+    resident memory exceeds ``max_rss_mb``, after ``max_errors`` errors, or
+    after ``max_uses`` leases as a safety ceiling. With ``spare`` enabled a
+    replacement is launched in the background as soon as the current driver
+    is in use, so a recycle swaps drivers instead of waiting for Chrome to
+    start.
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: str = "browser", max_uses: int = 0,
+                 max_rss_mb: float = BROWSER_MAX_RSS_MB, max_errors: int = BROWSER_MAX_ERRORS,
+                 spare: bool = BROWSER_SPARE):
+        self.factory = factory
+        self.name = name
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.max_errors = max_errors
+        self.spare_enabled = spare
+        self.recycles = 0
+        self.launch_secs: List[float] = []
+        self._current: Optional[Lease] = None
+        self._spare = None
+        self._spare_thread: Optional[threading.Thread] = None
+        self._launch_lock = threading.Lock()
+
+    def _launch(self):
+        # undetected-chromedriver patches a shared binary on launch; never run two at once.
+        with self._launch_lock:
+            started = time.time()
+            driver = self.factory()
+            self.launch_secs.append(time.time() - started)
+            return driver
+
+    def _launch_spare(self) -> None:
+        try:
+            self._spare = self._launch()
+        except Exception as e:
+            logging.warning("Pool[%s]: spare launch failed: %s", self.name, e)
+            self._spare = None
+
+    def _ensure_spare(self) -> None:
+        if not self.spare_enabled or self._spare is not None:
+            return
+        if self._spare_thread is not None and self._spare_thread.is_alive():
+            return
+        self._spare_thread = threading.Thread(target=self._launch_spare, name=f"{self.name}-spare", daemon=True)
+        self._spare_thread.start()
+
+    def _take_spare(self):
+        if self._spare_thread is not None:
+            self._spare_thread.join()
+            self._spare_thread = None
+        driver, self._spare = self._spare, None
+        return driver
+
+    @staticmethod
+    def _probe(driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _dispose(self, driver) -> None:
+        def quit_quietly():
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        threading.Thread(target=quit_quietly, daemon=True).start()
+
+    def _checkout(self) -> Lease:
+        for _ in range(2):
+            if self._current is None:
+                driver = self._take_spare() or self._launch()
+                self._current = Lease(driver)
+            if self._probe(self._current.driver):
+                self._ensure_spare()
+                return self._current
+            logging.warning("Pool[%s]: driver failed health probe; replacing", self.name)
+            self.recycle("probe")
+        raise RuntimeError(f"Pool[{self.name}]: could not obtain a healthy browser")
+
+    def _checkin(self, lease: Lease) -> None:
+        lease.uses += 1
+        reason = ""
+        if lease.broken:
+            reason = "broken"
+        elif self.max_errors and lease.errors >= self.max_errors:
+            reason = f"errors={lease.errors}"
+        elif self.max_uses and lease.uses >= self.max_uses:
+            reason = f"uses={lease.uses}"
+        else:
+            rss = driver_rss_mb(lease.driver)
+            if rss is not None and self.max_rss_mb and rss >= self.max_rss_mb:
+                reason = f"rss={rss:.0f}MB"
+        if reason:
+            self.recycle(reason)
+
+    def recycle(self, reason: str = "manual") -> None:
+        if self._current is None:
+            return
+        logging.info("Pool[%s]: recycling browser (%s)", self.name, reason)
+        self.recycles += 1
+        self._dispose(self._current.driver)
+        self._current = None
+
+    @contextmanager
+    def lease(self) -> Iterator[Lease]:
+        lease = self._checkout()
+        try:
+            yield lease
+        except Exception:
+            lease.record_error()
+            raise
+        finally:
+            self._checkin(lease)
+
+    def close(self) -> None:
+        started = time.time()
+        drivers = []
+        if self._current is not None:
+            drivers.append(self._current.driver)
+            self._current = None
+        spare = self._take_spare()
+        if spare is not None:
+            drivers.append(spare)
+        for d in drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
+        logging.info("Pool[%s]: closed after %d recycles (%.1fs) | %s", self.name, self.recycles,
+                     time.time() - started, self.startup_summary())
+
+    def startup_summary(self) -> str:
+        if not self.launch_secs:
+            return "no launches"
+        secs = self.launch_secs
+        return f"{len(secs)} launches, startup avg {sum(secs) / len(secs):.1f}s / max {max(secs):.1f}s"
+
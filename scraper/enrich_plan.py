@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import calendar, sys, time
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import PHONE_REVERIFY_TTL_DAYS
+
+VERIFIED_AT_FORMATS = ("%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+
+def verified_at_now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def parse_verified_at(value: str) -> Optional[float]:
+    """Epoch seconds for a ``phone_verified_at`` cell (UTC), or None if empty/unparseable."""
+    s = (value or "").strip()
+    if not s:
+        return None
+    # Supabase returns timestamptz as e.g. 2026-03-18T10:00:00.123+00:00
+    s = s.split(".")[0].split("+")[0]
+    for fmt in VERIFIED_AT_FORMATS:
+        try:
+            return float(calendar.timegm(time.strptime(s, fmt)))
+        except ValueError:
+            continue
+    return None
+
+
+def _truthy(v: str) -> bool:
+    return str(v or "").strip().lower() in {"true", "t", "1", "yes", "y"}
+
+
+def enrich_reason(row: Dict[str, str], now: float, ttl_days: float = PHONE_REVERIFY_TTL_DAYS) -> str:
+    """Why ``row`` needs a phone check ("" if it does not).
+
+    Rows never verified, or verified more than ``ttl_days`` ago, are checked.
+    A row verified without a timestamp (older data) is trusted if it has a
+    phone and re-checked if it does not.
+    """
+    if not (row.get("profile_url") or "").strip():
+        return ""
+    verified_at = parse_verified_at(row.get("phone_verified_at", ""))
+    if not _truthy(row.get("phone_verified")) and verified_at is None:
+        return "unverified"
+    has_phone = bool((row.get("phone_e164") or row.get("phone") or "").strip())
+    if verified_at is None:
+        return "" if has_phone else "missing phone"
+    if ttl_days > 0 and now - verified_at > ttl_days * 86400:
+        return "stale"
+    return ""
+
+
+def plan_enrichment(rows: List[Dict[str, str]], limit: Optional[int] = None,
+                    ttl_days: float = PHONE_REVERIFY_TTL_DAYS,
+                    now: Optional[float] = None) -> Tuple[List[int], Dict[str, int]]:
+    """Indices of rows to visit (at most ``limit``) and a count per reason, plus "skipped"/"deferred"."""
+    now = now or time.time()
+    todo: List[int] = []
+    counts: Dict[str, int] = {"skipped": 0, "deferred": 0}
+    for i, row in enumerate(rows):
+        reason = enrich_reason(row, now, ttl_days)
+        if not reason:
+            counts["skipped"] += 1
+        elif limit is not None and len(todo) >= limit:
+            counts["deferred"] += 1
+        else:
+            todo.append(i)
+            counts[reason] = counts.get(reason, 0) + 1
+    return todo, counts
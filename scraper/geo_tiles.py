@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import math, re
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Viewport of the scraper's browser window (see --window-size in new_driver).
+VIEWPORT_WIDTH_PX = 1280
+VIEWPORT_HEIGHT_PX = 1000
+TILE_PX = 256
+
+VIEWPORT_RE = re.compile(r"/@(-?\d{1,3}(?:\.\d+)?),(-?\d{1,3}(?:\.\d+)?),(\d{1,2}(?:\.\d+)?)z")
+
+
+@dataclass(frozen=True)
+class Tile:
+    lat: float
+    lng: float
+    zoom: float
+    depth: int = 0
+
+    def url_fragment(self) -> str:
+        return f"@{self.lat:.6f},{self.lng:.6f},{self.zoom:.2f}z"
+
+
+def parse_viewport(url: str) -> Optional[Tile]:
+    m = VIEWPORT_RE.search(url or "")
+    if not m:
+        return None
+    return Tile(float(m.group(1)), float(m.group(2)), float(m.group(3)))
+
+
+def viewport_span(lat: float, zoom: float) -> tuple:
+    """Return (lat_span, lng_span) in degrees covered by the window at ``zoom``."""
+    lng_span = 360.0 * VIEWPORT_WIDTH_PX / (TILE_PX * 2 ** zoom)
+    # Web Mercator: north-south degrees shrink with cos(lat).
+    lat_span = 360.0 * VIEWPORT_HEIGHT_PX / (TILE_PX * 2 ** zoom) * math.cos(math.radians(lat))
+    return lat_span, lng_span
+
+
+def plan_grid(center: Tile, grid: int) -> List[Tile]:
+    """Split the viewport around ``center`` into ``grid`` x ``grid`` tiles.
+
+    Each tile zooms in by log2(grid) so together they cover exactly the
+    original viewport.
+    """
+    if grid <= 1:
+        return [Tile(center.lat, center.lng, center.zoom, 0)]
+    lat_span, lng_span = viewport_span(center.lat, center.zoom)
+    zoom = center.zoom + math.log2(grid)
+    tiles = []
+    for r in range(grid):
+        for c in range(grid):
+            lat = center.lat + lat_span * ((r + 0.5) / grid - 0.5)
+            lng = center.lng + lng_span * ((c + 0.5) / grid - 0.5)
+            tiles.append(Tile(round(lat, 6), round(lng, 6), zoom, 0))
+    return tiles
+
+
+def subdivide(tile: Tile) -> List[Tile]:
+    """Four quadrant tiles one zoom level deeper, for tiles that hit the result cap."""
+    return [Tile(t.lat, t.lng, t.zoom, tile.depth + 1) for t in plan_grid(tile, 2)]
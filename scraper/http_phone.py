@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Browserless phone lookup for place pages.
+
+A keep-alive ``requests.Session`` fetches the place URL and the phone is read
+from the server-rendered page: the ``data-item-id="phone:tel:..."`` button
+markup, a ``tel:`` link, or the place record inside
+``APP_INITIALIZATION_STATE``. A phone is only taken when it provably
+belongs to the requested place: a state record with the URL's data id, or
+markup under a panel titled with the URL's place name. Anything
+inconclusive (block page, error, another place's phone, no phone in the
+markup) returns None and the caller falls back to Chrome.
+"""
+import html as htmllib
+import json, logging, random, re, sys, unicodedata
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import unquote, unquote_plus, urlparse
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import HTTP_PHONE_TIMEOUT, HTTP_PHONE_MAX_BLOCKS, USER_AGENTS, ACCEPT_LANG
+from scraper.maps_payload import XSSI_PREFIX, ids_from_profile_url, load_payload, parse_place_entry
+from scraper.proxy_pool import ProxyPool
+
+PHONE_ITEM_RE = re.compile(r"phone:tel:(\+?[0-9][0-9 ()./-]{3,}[0-9])")
+TEL_HREF_RE = re.compile(r"""href=["']tel:([^"']{4,40})["']""", re.I)
+INIT_STATE_RE = re.compile(r"APP_INITIALIZATION_STATE\s*=\s*(\[.*?\]);\s*window\.", re.S)
+PANEL_NAME_RE = re.compile(r"<h1[^>]*>(.*?)</h1>|role=[\"']main[\"'][^>]*aria-label=[\"']([^\"']+)", re.S | re.I)
+PLACE_SLUG_RE = re.compile(r"/maps/place/([^/?#]+)")
+BLOCK_URL_RE = re.compile(r"^consent\.|/sorry/", re.I)
+BLOCK_TEXT_RE = re.compile(r"unusual traffic|not a robot", re.I)
+
+
+def _payload_strings(obj: Any, depth: int = 0) -> Iterator[str]:
+    if depth > 6:
+        return
+    if isinstance(obj, str):
+        if obj.lstrip().startswith(XSSI_PREFIX):
+            yield obj
+    elif isinstance(obj, list):
+        for child in obj:
+            yield from _payload_strings(child, depth + 1)
+
+
+def _place_records(obj: Any, depth: int = 0) -> Iterator[Dict[str, str]]:
+    if not isinstance(obj, list) or depth > 4:
+        return
+    rec = parse_place_entry(obj)
+    if rec:
+        yield rec
+        return
+    for child in obj:
+        yield from _place_records(child, depth + 1)
+
+
+def _norm_name(s: str) -> str:
+    s = unicodedata.normalize("NFKC", htmllib.unescape(re.sub(r"<[^>]+>", " ", s or ""))).lower()
+    return " ".join(re.findall(r"\w+", s))
+
+
+def expected_place(url: str) -> Dict[str, str]:
+    """The data id and normalized slug name a place URL promises."""
+    data_id, _ = ids_from_profile_url(url)
+    m = PLACE_SLUG_RE.search(url or "")
+    return {"data_id": data_id.lower(), "name": _norm_name(unquote_plus(m.group(1))) if m else ""}
+
+
+def phone_from_state(html: str, url: str) -> str:
+    m = INIT_STATE_RE.search(html or "")
+    if not m:
+        return ""
+    try:
+        state = json.loads(m.group(1))
+    except ValueError:
+        return ""
+    want = expected_place(url)
+    for text in _payload_strings(state):
+        for rec in _place_records(load_payload(text)):
+            if not rec["phone"]:
+                continue
+            if want["data_id"]:
+                if rec["data_id"].lower() == want["data_id"]:
+                    return rec["phone"]
+            elif want["name"] and _norm_name(rec["name"]) == want["name"]:
+                return rec["phone"]
+    return ""
+
+
+def panel_matches(html: str, url: str) -> bool:
+    """True when the page's place panel is titled with the place name in ``url``."""
+    want = expected_place(url)["name"]
+    m = PANEL_NAME_RE.search(html or "")
+    return bool(want and m and _norm_name(m.group(1) or m.group(2)) == want)
+
+
+def parse_phone_html(html: str, url: str) -> str:
+    """Phone of the place ``url`` points at, "" if the page has none that provably belongs to it."""
+    if not html:
+        return ""
+    if panel_matches(html, url):
+        phones = {p.strip() for p in PHONE_ITEM_RE.findall(html)}
+        if len(phones) == 1:
+            return phones.pop()
+        tels = {unquote(t).strip() for t in TEL_HREF_RE.findall(html)}
+        if not phones and len(tels) == 1:
+            return tels.pop()
+    return phone_from_state(html, url)
+
+
+class HttpPhoneFetcher:
+    """One keep-alive session per enricher worker (``requests.Session`` is not thread-safe).
+
+    ``fetch`` returns the phone or None. After ``max_blocks`` block pages in
+    a row the fast path switches itself off for the rest of the run so every
+    URL goes straight to the browser. With ``proxies`` every request's
+    outcome is reported to the pool, and the session moves to a fresh proxy
+    as soon as its current one is blocked or quarantined.
+    """
+
+    def __init__(self, timeout: float = HTTP_PHONE_TIMEOUT, max_blocks: int = HTTP_PHONE_MAX_BLOCKS,
+                 proxies: Optional[ProxyPool] = None, ua: Optional[str] = None, lang: Optional[str] = None):
+        self.timeout = timeout
+        self.max_blocks = max_blocks
+        self.proxies = proxies
+        self.proxy: Optional[str] = None
+        self.enabled = True
+        self.blocks = 0
+        self.hits = 0
+        self.misses = 0
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": ua or random.choice(USER_AGENTS),
+            "Accept-Language": lang or random.choice(ACCEPT_LANG),
+            "Accept": "text/html,application/xhtml+xml",
+            "Connection": "keep-alive",
+        })
+        # Pre-accepted consent so EU egress gets the place page, not the consent wall.
+        self.session.cookies.set("CONSENT", "YES+cb", domain=".google.com")
+        self._rotate()
+
+    def _rotate(self) -> None:
+        if self.proxies is None:
+            return
+        self.proxy = self.proxies.pick()
+        self.session.proxies.update({"http": self.proxy, "https": self.proxy})
+
+    def _report(self, ok: bool, latency: Optional[float] = None, blocked: bool = False) -> None:
+        if self.proxies is not None:
+            self.proxies.report(self.proxy, ok, latency=latency, blocked=blocked)
+
+    def fetch(self, url: str) -> Optional[str]:
+        if not self.enabled or not url:
+            return None
+        if self.proxies is not None and self.proxies.quarantined(self.proxy):
+            self._rotate()
+        try:
+            resp = self.session.get(url, timeout=self.timeout, allow_redirects=True)
+        except Exception as e:
+            logging.debug("HTTP fast path failed for %s: %s", url, e)
+            self._report(False)
+            self.misses += 1
+            return None
+        final = urlparse(resp.url)
+        if resp.status_code in (403, 429) or BLOCK_URL_RE.search(final.netloc) or BLOCK_URL_RE.search(final.path) \
+                or BLOCK_TEXT_RE.search(resp.text[:4000]):
+            self._report(False, blocked=True)
+            self._rotate()
+            self.blocks += 1
+            self.misses += 1
+            if self.max_blocks and self.blocks >= self.max_blocks:
+                self.enabled = False
+                logging.warning("HTTP fast path: %d block pages in a row; using the browser only", self.blocks)
+            return None
+        self._report(200 <= resp.status_code < 400, latency=resp.elapsed.total_seconds())
+        self.blocks = 0
+        phone = parse_phone_html(resp.text, url) if resp.status_code == 200 else ""
+        if not phone:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return phone
+
+    def status(self) -> str:
+        total = self.hits + self.misses
+        rate = 100.0 * self.hits / total if total else 0.0
+        return f"hits={self.hits} misses={self.misses} ({rate:.0f}% fast){'' if self.enabled else ' | disabled'}"
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import csv, json, logging, os, time
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+
+class Journal:
+    """Append-only JSONL sidecar; ``commit()`` makes everything written so far durable."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = None
+
+    def append(self, record: Dict[str, Any]) -> None:
+        if self._f is None:
+            torn = _ends_torn(self.path)
+            self._f = open(self.path, "a", encoding="utf-8")
+            if torn:
+                # Start on a fresh line so the next record is not glued onto a torn one.
+                self._f.write("\n")
+        self._f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def commit(self) -> None:
+        if self._f is not None:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        if self._f is not None:
+            self.commit()
+            self._f.close()
+            self._f = None
+
+    @staticmethod
+    def read(path: str) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for ln in f:
+                try:
+                    yield json.loads(ln)
+                except ValueError:
+                    # A crash mid-write leaves at most one torn trailing line.
+                    logging.warning("Journal %s: skipping unreadable line", path)
+
+
+def _ends_torn(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+    except OSError:
+        return False
+
+
+def journal_path_for(csv_path: str) -> str:
+    return csv_path + ".journal"
+
+
+def load_run_state(journal_path: str) -> Tuple[Set[str], Set[str]]:
+    """Return (committed profile URLs, finished ``location|category`` keys)."""
+    urls: Set[str] = set()
+    done: Set[str] = set()
+    for rec in Journal.read(journal_path):
+        if rec.get("u"):
+            urls.add(rec["u"])
+        elif rec.get("done"):
+            done.add(rec["done"])
+    return urls, done
+
+
+def load_enrichment(journal_path: str) -> Dict[str, Dict[str, str]]:
+    """Phone results journaled by the enricher, keyed by profile URL (last record wins)."""
+    results: Dict[str, Dict[str, str]] = {}
+    for rec in Journal.read(journal_path):
+        if rec.get("e"):
+            results[rec["e"]] = {"phone": rec.get("p", ""), "verified_at": rec.get("at", "")}
+    return results
+
+
+def category_key(location: str, category: str) -> str:
+    return f"{location}|{category}"
+
+
+class BufferedCsvWriter:
+    """Long-lived CSV appender with periodic flush + fsync and a commit journal.
+
+    Rows are buffered and written in batches of ``flush_every`` rows or every
+    ``flush_secs`` seconds. A row's key is journaled only after the row itself
+    is on disk, so the journal never claims a row the CSV does not have and
+    resume can trust it without re-parsing the CSV. ``existing_keys`` are
+    journaled when the journal is first created over a CSV that already has
+    rows, so those rows stay deduped on every later resume.
+    """
+
+    def __init__(self, csv_path: str, fieldnames: List[str], key_field: str = "profile_url",
+                 flush_every: int = 25, flush_secs: float = 10.0, existing_keys: Iterable[str] = ()):
+        self.csv_path = csv_path
+        self.key_field = key_field
+        self.flush_every = flush_every
+        self.flush_secs = flush_secs
+        self.journal = Journal(journal_path_for(csv_path))
+        new_file = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+        if not new_file and not os.path.exists(self.journal.path):
+            for key in sorted(k for k in existing_keys if k):
+                self.journal.append({"u": key})
+            self.journal.commit()
+        self._f = open(csv_path, "a", encoding="utf-8-sig", newline="")
+        self._w = csv.DictWriter(self._f, fieldnames=fieldnames)
+        if new_file:
+            self._w.writeheader()
+        self._buf: List[Dict[str, Any]] = []
+        self._last_flush = time.time()
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._buf.append(row)
+        if len(self._buf) >= self.flush_every or time.time() - self._last_flush >= self.flush_secs:
+            self.flush()
+
+    def mark_done(self, key: str) -> None:
+        self.flush()
+        self.journal.append({"done": key})
+        self.journal.commit()
+
+    def flush(self) -> None:
+        self._last_flush = time.time()
+        if not self._buf:
+            return
+        self._w.writerows(self._buf)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        for row in self._buf:
+            if row.get(self.key_field):
+                self.journal.append({"u": row[self.key_field]})
+        self.journal.commit()
+        self._buf = []
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._f.close()
+            self.journal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
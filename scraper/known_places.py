@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import argparse, csv, logging, os, sqlite3, sys, time
+from typing import Iterable
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import LOG_FORMAT, LOG_LEVEL, SUPABASE_TABLE_NAME
+from scraper.maps_payload import place_keys
+
+
+class KnownPlaceIndex:
+    """On-disk set of places already stored by earlier runs (SQLite, one row per key)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS places (key TEXT PRIMARY KEY, seen_at INTEGER NOT NULL)")
+        self._db.commit()
+
+    def __contains__(self, url: str) -> bool:
+        keys = place_keys(url)
+        if not keys:
+            return False
+        q = "SELECT 1 FROM places WHERE key IN (%s) LIMIT 1" % ",".join("?" * len(keys))
+        return self._db.execute(q, keys).fetchone() is not None
+
+    def has_key(self, key: str) -> bool:
+        """True if ``key`` (one of ``place_keys``) is stored."""
+        return self._db.execute("SELECT 1 FROM places WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+
+    def add_many(self, urls: Iterable[str]) -> int:
+        now = int(time.time())
+        rows = [(k, now) for u in urls for k in place_keys(u)]
+        self._db.executemany("INSERT OR REPLACE INTO places (key, seen_at) VALUES (?, ?)", rows)
+        return len(rows)
+
+    def add(self, url: str) -> None:
+        self.add_many([url])
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.commit()
+        self._db.close()
+
+
+def iter_csv_urls(path: str) -> Iterable[str]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            u = (row.get("profile_url") or "").strip()
+            if u:
+                yield u
+
+
+def iter_supabase_urls(page_size: int = 1000) -> Iterable[str]:
+    from supabase import create_client
+
+    url = os.environ.get("SUPABASE_URL", "").strip()
+    key = os.environ.get("SUPABASE_SERVICE_ROLE", "").strip()
+    if not url or not key:
+        raise RuntimeError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE")
+    client = create_client(url, key)
+    start = 0
+    while True:
+        res = client.table(SUPABASE_TABLE_NAME).select("profile_url").range(start, start + page_size - 1).execute()
+        rows = res.data or []
+        for r in rows:
+            if r.get("profile_url"):
+                yield r["profile_url"]
+        if len(rows) < page_size:
+            break
+        start += page_size
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build or refresh the local known-place index")
+    ap.add_argument("--index", required=True, help="SQLite index path")
+    ap.add_argument("--from-csv", nargs="*", default=[], help="CSV files with a profile_url column")
+    ap.add_argument("--from-supabase", action="store_true", help="Pull every stored profile_url from Supabase")
+    ap.add_argument("--log", default=LOG_LEVEL)
+    args = ap.parse_args()
+
+    level = getattr(logging, args.log.upper(), getattr(logging, LOG_LEVEL, logging.INFO))
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=sys.stdout)
+
+    index = KnownPlaceIndex(args.index)
+    try:
+        for path in args.from_csv:
+            if os.path.exists(path):
+                n = index.add_many(iter_csv_urls(path))
+                logging.info("Indexed %d keys from %s", n, path)
+        if args.from_supabase:
+            n = index.add_many(iter_supabase_urls())
+            logging.info("Indexed %d keys from %s", n, SUPABASE_TABLE_NAME)
+        index.commit()
+        logging.info("Known-place index %s now holds %d keys", args.index, len(index))
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
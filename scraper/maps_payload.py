@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Parsers for the JSON payloads the Maps results pane loads over the network.
+
+The ``/search?tbm=map`` responses carry the same place records the feed
+renders, as deeply nested positional arrays. Index paths below follow the
+layout those responses have used for years; every lookup is defensive so a
+layout change degrades to "no record" and the DOM path takes over.
+"""
+import json, re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote_plus
+
+XSSI_PREFIX = ")]}'"
+
+DATA_ID_RE = re.compile(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)", re.I)
+# Feed links carry ``!19sChIJ..``; the cleaner rewrites stored URLs to ``?q=place_id:ChIJ..``.
+PLACE_ID_RE = re.compile(r"(?:!\d+s|place_id[:=])(ChIJ[0-9A-Za-z_-]+)")
+TRAILING_QS_RE = re.compile(r"[?#].*$")
+
+
+def _strip_xssi(text: str) -> str:
+    text = (text or "").lstrip()
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX):]
+    return text.strip()
+
+
+def load_payload(text: str) -> Any:
+    try:
+        data = json.loads(_strip_xssi(text))
+    except ValueError:
+        return None
+    # Older endpoints wrap the real payload as a string under "d".
+    if isinstance(data, dict) and isinstance(data.get("d"), str):
+        try:
+            data = json.loads(_strip_xssi(data["d"]))
+        except ValueError:
+            return None
+    return data
+
+
+def _dig(obj: Any, *path) -> Any:
+    for key in path:
+        if not isinstance(obj, list) or not isinstance(key, int) or key >= len(obj):
+            return None
+        obj = obj[key]
+    return obj
+
+
+def _text(v: Any) -> str:
+    return v.strip() if isinstance(v, str) else ""
+
+
+def parse_place_entry(d: List) -> Optional[Dict[str, str]]:
+    name = _text(_dig(d, 11))
+    data_id = _text(_dig(d, 10))
+    place_id = _text(_dig(d, 78))
+    if not name or not (data_id or place_id):
+        return None
+    lat = _dig(d, 9, 2)
+    lng = _dig(d, 9, 3)
+    rating = _dig(d, 4, 7)
+    reviews = _dig(d, 4, 8)
+    categories = _dig(d, 13) or []
+    address = _text(_dig(d, 39))
+    if not address:
+        parts = _dig(d, 2) or []
+        address = ", ".join(p for p in parts if isinstance(p, str))
+    return {
+        "name": name,
+        "data_id": data_id,
+        "place_id": place_id,
+        "lat": str(lat) if isinstance(lat, (int, float)) else "",
+        "lng": str(lng) if isinstance(lng, (int, float)) else "",
+        "rating": str(rating) if isinstance(rating, (int, float)) else "",
+        "reviews_count": str(reviews) if isinstance(reviews, int) else "",
+        "category_line": _text(categories[0]) if isinstance(categories, list) and categories else "",
+        "address": address,
+        "phone": _text(_dig(d, 178, 0, 0)),
+        "website": _text(_dig(d, 7, 0)),
+    }
+
+
+def _iter_place_arrays(obj: Any, depth: int = 0):
+    if not isinstance(obj, list) or depth > 6:
+        return
+    inner = _dig(obj, 14)
+    if isinstance(inner, list) and isinstance(_dig(inner, 11), str):
+        yield inner
+        return
+    for child in obj:
+        yield from _iter_place_arrays(child, depth + 1)
+
+
+def parse_search_payload(text: str) -> List[Dict[str, str]]:
+    records = []
+    for arr in _iter_place_arrays(load_payload(text)):
+        rec = parse_place_entry(arr)
+        if rec:
+            records.append(rec)
+    return records
+
+
+def ids_from_profile_url(url: str) -> Tuple[str, str]:
+    m = DATA_ID_RE.search(url or "")
+    data_id = m.group(1) if m else ""
+    m = PLACE_ID_RE.search(url or "")
+    place_id = m.group(1) if m else ""
+    return data_id, place_id
+
+
+def place_keys(url: str) -> List[str]:
+    """Dedupe keys for a profile URL: its place id and feature id, else the bare URL.
+
+    Feed links, ``profile_url_for`` and cleaned ``?q=place_id:...`` URLs
+    never agree as strings, so places are matched on their ids; run dedupe
+    and the known-place index both key on these.
+    """
+    url = (url or "").strip()
+    if not url:
+        return []
+    data_id, place_id = ids_from_profile_url(url)
+    keys = []
+    if place_id:
+        keys.append("pid:" + place_id)
+    if data_id:
+        keys.append("did:" + data_id.lower())
+    if not keys:
+        keys.append("url:" + TRAILING_QS_RE.sub("", url))
+    return keys
+
+
+def profile_url_for(rec: Dict[str, str]) -> str:
+    data = "!4m2!3m1"
+    if rec.get("data_id"):
+        data += "!1s" + rec["data_id"]
+    if rec.get("place_id"):
+        data += "!19s" + rec["place_id"]
+    return f"https://www.google.com/maps/place/{quote_plus(rec.get('name', ''))}/data={data}"
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import logging, random, sys, threading, time
+from typing import Dict, Optional
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import (
+    PACING_MIN_SCALE,
+    PACING_MAX_SCALE,
+    PACING_DECREASE_STEP,
+    PACING_BACKOFF,
+    PACING_SLOW_SECS,
+    PACING_LOG_EVERY,
+)
+
+
+class AdaptivePacer:
+    """AIMD controller for the random sleeps between browser actions.
+
+    Every ``jitter(a, b)`` range is multiplied by ``scale``. Healthy signals
+    (fast navigations) shave ``step`` off the scale; trouble (timeouts, slow
+    loads, block pages) multiplies it by ``backoff``. The scale stays within
+    [min_scale, max_scale], so a healthy run speeds up gradually and a
+    throttled one backs off at once.
+    """
+
+    def __init__(self, name: str, min_scale: float = PACING_MIN_SCALE, max_scale: float = PACING_MAX_SCALE,
+                 step: float = PACING_DECREASE_STEP, backoff: float = PACING_BACKOFF,
+                 slow_secs: float = PACING_SLOW_SECS, log_every: int = PACING_LOG_EVERY):
+        self.name = name
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.step = step
+        self.backoff = backoff
+        self.slow_secs = slow_secs
+        self.log_every = log_every
+        self.scale = 1.0
+        self.ok = 0
+        self.trouble_counts: Dict[str, int] = {}
+        self.slept = 0.0
+        self._lock = threading.Lock()
+
+    def delay(self, a: float, b: float) -> float:
+        return random.uniform(a, b) * self.scale
+
+    def sleep(self, a: float, b: float) -> None:
+        d = self.delay(a, b)
+        with self._lock:
+            self.slept += d
+        time.sleep(d)
+
+    def success(self, latency: Optional[float] = None) -> None:
+        if latency is not None and latency > self.slow_secs:
+            self.trouble("slow")
+            return
+        with self._lock:
+            self.scale = max(self.min_scale, self.scale - self.step)
+            self.ok += 1
+            report = self.log_every and self.ok % self.log_every == 0
+        if report:
+            logging.info("Pacing[%s]: %s", self.name, self.status())
+
+    def trouble(self, kind: str) -> None:
+        with self._lock:
+            self.scale = min(self.max_scale, self.scale * self.backoff)
+            self.trouble_counts[kind] = self.trouble_counts.get(kind, 0) + 1
+        logging.warning("Pacing[%s]: backing off after %s -> %s", self.name, kind, self.status())
+
+    def status(self) -> str:
+        trouble = ", ".join(f"{k}={v}" for k, v in sorted(self.trouble_counts.items())) or "none"
+        return f"delay x{self.scale:.2f} | ok={self.ok} | trouble: {trouble} | slept={self.slept:.0f}s"
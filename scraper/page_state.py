@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import logging, sys, time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import BLOCK_TRIP_AFTER, BLOCK_EMPTY_STREAK, BLOCK_MAX_TRIPS
+
+# States: results | place | empty | consent | captcha | loading
+PAGE_STATE_JS = """
+var cardSel = arguments[0], placeXp = arguments[1];
+var href = location.href, host = location.hostname;
+var text = document.body ? (document.body.innerText || '').slice(0, 4000) : '';
+if (/\\/sorry\\//.test(href) || document.querySelector('form#captcha-form, iframe[src*="recaptcha"], div.g-recaptcha')
+    || /unusual traffic|not a robot/i.test(text)) return 'captcha';
+if (/^consent\\./.test(host) || document.querySelector('form[action*="consent.google"]')) return 'consent';
+if (document.querySelectorAll(cardSel).length) return 'results';
+var h = document.evaluate(placeXp, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (h && (h.textContent || '').trim()) return 'place';
+if (document.readyState !== 'loading' && /can't find|No results found|did not match any/i.test(text)) return 'empty';
+return 'loading';
+"""
+
+CONSENT_ACCEPT_JS = """
+var pat = /^(accept all|reject all|i agree|alle akzeptieren|tout accepter|aceptar todo|accetta tutto)$/i;
+var els = document.querySelectorAll('button, input[type=submit]');
+for (var i = 0; i < els.length; i++) {
+  var t = (els[i].innerText || els[i].value || els[i].getAttribute('aria-label') || '').trim();
+  if (pat.test(t)) { els[i].click(); return true; }
+}
+return false;
+"""
+
+BLOCK_STATES = ("captcha", "consent")
+
+
+def classify_page(driver, card_css: str, place_xp: str) -> str:
+    try:
+        state = driver.execute_script(PAGE_STATE_JS, card_css, place_xp)
+        return state if isinstance(state, str) else "loading"
+    except Exception as e:
+        logging.debug("Page state probe failed: %s", e)
+        return "loading"
+
+
+def wait_for_page_state(driver, card_css: str, place_xp: str, timeout: float, poll: float = 0.4) -> str:
+    """Poll ``classify_page`` until the page settles on a state or ``timeout`` passes."""
+    deadline = time.time() + timeout
+    state = classify_page(driver, card_css, place_xp)
+    while state == "loading" and time.time() < deadline:
+        time.sleep(poll)
+        state = classify_page(driver, card_css, place_xp)
+    return state
+
+
+def dismiss_consent(driver) -> bool:
+    try:
+        return bool(driver.execute_script(CONSENT_ACCEPT_JS))
+    except Exception:
+        return False
+
+
+class RunBlocked(RuntimeError):
+    """Raised when the circuit breaker gives up on this runner; ``rows`` were kept before it did."""
+
+    def __init__(self, message: str = "", rows: int = 0):
+        super().__init__(message)
+        self.rows = rows
+
+
+class CircuitBreaker:
+    """Escalates repeated block pages: pause, then rotate identity, then abort.
+
+    ``record`` takes every classified navigation. ``trip_after`` block pages
+    in a row (captcha or an undismissable consent wall; ``empty_streak``
+    empty feeds or navigation timeouts in a row count as one) trip the
+    breaker, and each trip escalates one step up the ladder returned by
+    ``action``.
+    """
+
+    LADDER = ("pause", "rotate", "abort")
+
+    def __init__(self, name: str, trip_after: int = BLOCK_TRIP_AFTER, empty_streak: int = BLOCK_EMPTY_STREAK,
+                 max_trips: int = BLOCK_MAX_TRIPS):
+        self.name = name
+        self.trip_after = trip_after
+        self.empty_streak = empty_streak
+        self.max_trips = max_trips
+        self.strikes = 0
+        self.empties = 0
+        self.trips = 0
+        self.last_state = ""
+        self.counts = {}
+
+    @property
+    def blocked(self) -> bool:
+        return self.last_state in BLOCK_STATES
+
+    def record(self, state: str) -> None:
+        self.last_state = state
+        self.counts[state] = self.counts.get(state, 0) + 1
+        if state in BLOCK_STATES:
+            self.strikes += 1
+        elif state in ("empty", "timeout"):
+            self.empties += 1
+            if self.empty_streak and self.empties >= self.empty_streak:
+                self.empties = 0
+                self.strikes += 1
+        elif state in ("results", "place"):
+            self.strikes = 0
+            self.empties = 0
+
+    def action(self) -> str:
+        """Return "" while healthy, else the next ladder step (consuming the trip)."""
+        if self.strikes < self.trip_after:
+            return ""
+        self.strikes = 0
+        self.trips += 1
+        step = self.LADDER[min(self.trips, len(self.LADDER)) - 1]
+        if self.trips >= self.max_trips:
+            step = "abort"
+        logging.warning("Breaker[%s]: trip %d -> %s | %s", self.name, self.trips, step, self.status())
+        return step
+
+    def status(self) -> str:
+        seen = ", ".join(f"{k}={v}" for k, v in sorted(self.counts.items())) or "none"
+        return f"trips={self.trips} | pages: {seen}"
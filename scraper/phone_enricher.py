@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import csv, sys, os, time, random, unicodedata, re, argparse, logging
-from typing import Dict, Any, List, Optional
+import csv, sys, os, time, random, unicodedata, re, argparse, logging, queue, threading
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
 
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
@@ -31,7 +32,21 @@ from config import (
     PHONE_ENRICH_LIMIT,
     LOG_FORMAT,
     LOG_LEVEL,
+    PROXY_FILE,
+    PHONE_REVERIFY_TTL_DAYS,
+    ENRICH_CONCURRENCY,
+    ENRICH_MAX_TRIES,
+    HTTP_PHONE_FAST_PATH,
+    PHONE_SETTLE_MS,
+    BROWSER_SPARE,
 )
+from browser_utils import block_resources, launch_chrome
+from scraper.browser_pool import BrowserPool
+from scraper.enrich_plan import plan_enrichment, verified_at_now
+from scraper.http_phone import HttpPhoneFetcher
+from scraper.journal import Journal, journal_path_for, load_enrichment
+from scraper.pacing import AdaptivePacer
+from scraper.proxy_pool import ProxyPool, attach_proxy, driver_proxy, report_proxy
 
 DETAIL_PHONE_XP = "//button[.//div[contains(text(),'Phone') or contains(text(),'الهاتف') or contains(text(),'اتصال')]] | //a[contains(@href,'tel:')]"
 NBSP_REPL = {"\u00A0": " ", "\u202F": " "}
@@ -154,13 +169,17 @@ def normalize_phone_international(raw: str, location: str) -> str:
     return raw
 
 
+PACER = AdaptivePacer("enricher")
+LAUNCH_LOCK = threading.Lock()
+
+
 def jitter(a=ENRICH_JITTER_MIN, b=ENRICH_JITTER_MAX):
-    time.sleep(random.uniform(a, b))
+    PACER.sleep(a, b)
 
 
-def new_driver(headless: bool):
+def new_driver(headless: bool, proxy: Optional[str] = None):
     ua = random.choice(USER_AGENTS)
-    logging.info("Launching phone-enricher browser: UA=%s | headless=%s", ua, headless)
+    logging.info("Launching phone-enricher browser: UA=%s | headless=%s | proxy=%s", ua, headless, bool(proxy))
 
     def build_opts():
         opts = uc.ChromeOptions()
@@ -172,18 +191,12 @@ def new_driver(headless: bool):
         opts.add_argument("--disable-gpu")
         opts.add_argument("--user-agent=" + ua)
         opts.add_argument("--window-size=1280,900")
-        opts.add_argument("--blink-settings=imagesEnabled=true")
+        if proxy:
+            opts.add_argument(f"--proxy-server={proxy}")
         return opts
 
-    driver = None
-    for attempt in (1, 2):
-        try:
-            driver = uc.Chrome(options=build_opts(), version_main=124, use_subprocess=True)
-            break
-        except Exception as e:
-            logging.warning("Browser launch attempt %d failed: %s", attempt, e)
-            if attempt == 2:
-                raise
+    driver = launch_chrome(build_opts, label="phone-enricher browser")
+    block_resources(driver, "enricher")
 
     try:
         driver.set_page_load_timeout(PAGELOAD_TIMEOUT)
@@ -193,35 +206,124 @@ def new_driver(headless: bool):
     return driver
 
 
-def get_phone_from_page(driver, url: str, timeout: int = 8) -> str:
+PHONE_WAIT_JS = """
+var timeoutMs = arguments[0], settleMs = arguments[1], labelXp = arguments[2];
+var done = arguments[arguments.length - 1];
+var finished = false, obs = null, timer = null, settle = null;
+function panel() {
+  // The place panel is the main region labelled with the place's own title.
+  var mains = document.querySelectorAll('div[role="main"][aria-label]');
+  for (var i = 0; i < mains.length; i++) {
+    var h = mains[i].querySelector('h1');
+    var t = h && (h.textContent || '').trim();
+    if (t && t === (mains[i].getAttribute('aria-label') || '').trim()) return mains[i];
+  }
+  return null;
+}
+function phone(root) {
+  var b = root.querySelector('[data-item-id^="phone:tel:"]');
+  if (b) return b.getAttribute('data-item-id').split('phone:tel:').pop().trim();
+  var a = root.querySelector('a[href^="tel:"]');
+  if (a) return decodeURIComponent(a.getAttribute('href').slice(4)).trim();
+  var l = document.evaluate(labelXp, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  var id = l && l.getAttribute('data-item-id');
+  return id && id.indexOf('phone:tel:') >= 0 ? id.split('phone:tel:').pop().trim() : null;
+}
+function finish(state, p) {
+  if (finished) return;
+  finished = true;
+  if (obs) obs.disconnect();
+  clearTimeout(timer); clearTimeout(settle);
+  done({state: state, phone: p || ''});
+}
+function check(records) {
+  var box = panel();
+  var p = phone(box || document);
+  if (p) { finish('phone', p); return; }
+  if (!settleMs || !box || !box.querySelector('[data-item-id]')) return;
+  // "none" only after the panel's own info rows have been quiet for settleMs.
+  var touched = !records || records.some(function (r) { return box.contains(r.target); });
+  if (touched || !settle) {
+    clearTimeout(settle);
+    settle = setTimeout(function () { finish('none', phone(box)); }, settleMs);
+  }
+}
+check(null);
+if (finished) return;
+obs = new MutationObserver(check);
+obs.observe(document.documentElement, {childList: true, subtree: true, attributes: true,
+                                       attributeFilter: ['data-item-id', 'href', 'aria-label']});
+timer = setTimeout(function () { var box = panel(); finish('timeout', phone(box || document)); }, timeoutMs);
+"""
+
+
+def wait_for_phone(driver, timeout: float, settle_ms: int = PHONE_SETTLE_MS) -> Dict[str, str]:
+    """Wait in-page for a phone or a fully rendered place panel without one.
+
+    Returns {"state": "phone"|"none"|"timeout"|"error", "phone": ...}. A
+    no-phone place resolves once its panel's info rows have been quiet for
+    ``settle_ms`` instead of running out the whole ``timeout``; 0 disables
+    the early "none".
+    """
+    try:
+        res = driver.execute_async_script(PHONE_WAIT_JS, int(timeout * 1000), settle_ms, DETAIL_PHONE_XP)
+        if isinstance(res, dict):
+            return res
+    except Exception as e:
+        logging.debug("Phone wait script failed: %s", e)
+    return {"state": "error", "phone": ""}
+
+
+def scan_phone(driver) -> str:
+    # Try data-item-id first — most reliable, number is in the attribute itself
+    for xp in [
+        "//button[contains(@data-item-id,'phone:tel')]",
+        "//button[contains(@aria-label,'Phone') and @data-item-id]",
+        DETAIL_PHONE_XP,
+    ]:
+        try:
+            els = driver.find_elements(By.XPATH, xp)
+            for el in els:
+                item_id = el.get_attribute("data-item-id") or ""
+                if "phone:tel:" in item_id:
+                    return item_id.split("phone:tel:")[-1].strip()
+                href = el.get_attribute("href") or ""
+                if href.startswith("tel:"):
+                    return href.replace("tel:", "").strip()
+        except Exception:
+            continue
+    return ""
+
+
+def get_phone_from_page(driver, url: str, timeout: int = 8, early_none: bool = True) -> Optional[str]:
+    """Phone shown on ``url``'s place page ("" if none), or None when the page gave no answer.
+
+    Re-checks of a row that already has a phone pass ``early_none=False``:
+    a settled panel is not proof enough to wipe a known number, and a
+    re-check that times out without finding one returns None so the row
+    keeps its phone and is not stamped as verified.
+    """
     if not url:
         return ""
+    started = time.time()
     try:
         driver.get(url)
     except WebDriverException as e:
+        PACER.trouble("timeout" if isinstance(e, TimeoutException) else "nav-error")
+        report_proxy(driver, False)
         logging.warning("Navigation failed for %s: %s", url, e)
-        return ""
-# Try data-item-id first — most reliable, number is in the attribute itself
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        for xp in [
-            "//button[contains(@data-item-id,'phone:tel')]",
-            "//button[contains(@aria-label,'Phone') and @data-item-id]",
-            DETAIL_PHONE_XP,
-        ]:
-            try:
-                els = driver.find_elements(By.XPATH, xp)
-                for el in els:
-                    item_id = el.get_attribute("data-item-id") or ""
-                    if "phone:tel:" in item_id:
-                        return item_id.split("phone:tel:")[-1].strip()
-                    href = el.get_attribute("href") or ""
-                    if href.startswith("tel:"):
-                        return href.replace("tel:", "").strip()
-            except Exception:
-                continue
-        time.sleep(0.3)
-    return ""
+        return None
+    PACER.success(time.time() - started)
+    report_proxy(driver, True, latency=time.time() - started)
+    res = wait_for_phone(driver, timeout, PHONE_SETTLE_MS if early_none else 0)
+    if res.get("state") in ("phone", "none"):
+        return res.get("phone") or ""
+    # Script failed or the panel never settled: one last direct scan before giving up.
+    phone = scan_phone(driver)
+    if not phone and not early_none:
+        logging.info("Re-check of %s timed out without a phone; keeping the known one", url)
+        return None
+    return phone
 
 
 def read_csv(path: str):
@@ -232,69 +334,209 @@ def read_csv(path: str):
 
 
 def write_csv(path: str, fieldnames: List[str], rows: List[Dict[str, Any]]):
-    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8-sig", newline="") as f:
         w = csv.DictWriter(f, fieldnames=fieldnames)
         w.writeheader()
         for row in rows:
             w.writerow(row)
+    os.replace(tmp, path)
 
 
-def process(input_csv: str, output_csv: str, limit: Optional[int] = None, headless: bool = True):
-    logging.info("Starting phone enrichment: in=%s out=%s limit=%s", input_csv, output_csv, limit)
-    fieldnames, rows = read_csv(input_csv)
-    logging.info("Loaded %d rows from input", len(rows))
+def set_phone(row: Dict[str, Any], phone: str, verified_at: str) -> None:
+    row["phone"] = phone
+    row["phone_e164"] = phone
+    row["phone_verified"] = "TRUE"
+    row["phone_verified_at"] = verified_at
 
-    fieldnames = list(fieldnames)
-    if "phone" not in fieldnames:
-        fieldnames.append("phone")
-    if "phone_e164" not in fieldnames:
-        fieldnames.append("phone_e164")
-    if "phone_verified" not in fieldnames:
-        fieldnames.append("phone_verified")
 
-    rows_to_process = rows if limit is None else rows[:limit]
-    logging.info("Processing %d rows (all rows regardless of existing phone)", len(rows_to_process))
+@dataclass
+class EnrichItem:
+    seq: int
+    idx: int
+    url: str
+    location: str
+    tries: int = 0
+    has_phone: bool = False
 
-    driver = new_driver(headless=headless)
-    updated = 0
 
+def _driver_alive(driver) -> bool:
     try:
-        for batch_idx, row in enumerate(rows_to_process):
-            if PHONE_RESTART_EVERY and batch_idx > 0 and batch_idx % PHONE_RESTART_EVERY == 0:
-                logging.info("Restarting browser after %d rows", batch_idx)
-                try:
-                    driver.quit()
-                except Exception:
-                    pass
-                driver = new_driver(headless=headless)
-
-            url = (row.get("profile_url") or "").strip()
-            if not url:
-                row["phone_verified"] = "TRUE"
-                continue
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
 
-            location = (row.get("query_location") or "").strip()
-            raw_phone = get_phone_from_page(driver, url)
+def enrich_worker(pool: BrowserPool, proxies: Optional[ProxyPool], work: "queue.Queue[EnrichItem]",
+                  results: "queue.Queue", stop: threading.Event, fast: Optional[HttpPhoneFetcher] = None) -> None:
+    """Pull items off ``work`` and post (seq, row index, raw phone or None) to ``results``.
+
+    ``fast`` is tried first; only its misses open the URL in Chrome. If the
+    driver dies mid-item, only that item goes back on the queue (up to
+    ENRICH_MAX_TRIES); the dead driver is discarded and the pool launches a
+    new one. A worker that keeps failing to get a browser requeues and exits.
+    """
+    failures = 0
+    while not stop.is_set():
+        try:
+            item = work.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        raw_phone = fast.fetch(item.url) if fast is not None and item.tries == 0 else None
+        if raw_phone:
+            results.put((item.seq, item.idx, raw_phone))
             jitter()
+            continue
+        try:
+            with pool.lease() as lease:
+                raw_phone = get_phone_from_page(lease.driver, item.url, early_none=not item.has_phone)
+                if raw_phone is None:
+                    lease.record_error()  # no answer from the page; repeated failures recycle the browser
+                    if not _driver_alive(lease.driver):
+                        lease.discard()
+                        raise WebDriverException("browser died during navigation")
+                if proxies is not None and proxies.quarantined(driver_proxy(lease.driver)):
+                    lease.discard()
+        except Exception as e:
+            item.tries += 1
+            failures += 1
+            if item.tries < ENRICH_MAX_TRIES:
+                logging.warning("Pool[%s]: %s failed (%s); re-queued (try %d)", pool.name, item.url, e, item.tries)
+                work.put(item)
+            else:
+                logging.warning("Pool[%s]: giving up on %s after %d tries: %s", pool.name, item.url, item.tries, e)
+                results.put((item.seq, item.idx, None))
+            if failures >= ENRICH_MAX_TRIES:
+                logging.error("Pool[%s]: %d failures in a row; stopping this worker", pool.name, failures)
+                return
+            continue
+        failures = 0
+        results.put((item.seq, item.idx, raw_phone))
+        jitter()
+
+
+def process(input_csv: str, output_csv: str, limit: Optional[int] = None, headless: bool = True,
+            proxy_file: str = PROXY_FILE, reverify_ttl_days: float = PHONE_REVERIFY_TTL_DAYS,
+            concurrency: int = ENRICH_CONCURRENCY, http_fast_path: bool = HTTP_PHONE_FAST_PATH,
+            resume: bool = False):
+    logging.info("Starting phone enrichment: in=%s out=%s limit=%s concurrency=%d", input_csv, output_csv, limit,
+                 concurrency)
+    fieldnames, rows = read_csv(input_csv)
+    logging.info("Loaded %d rows from input", len(rows))
 
-            normalized = normalize_phone_international(raw_phone, location) if raw_phone else ""
-            row["phone"] = normalized
-            row["phone_e164"] = normalized
+    fieldnames = list(fieldnames)
+    for col in ("phone", "phone_e164", "phone_verified", "phone_verified_at"):
+        if col not in fieldnames:
+            fieldnames.append(col)
+
+    journal_path = journal_path_for(output_csv)
+    if resume:
+        done = load_enrichment(journal_path)
+        resumed = 0
+        for row in rows:
+            rec = done.get((row.get("profile_url") or "").strip())
+            if rec is not None:
+                set_phone(row, rec["phone"], rec["verified_at"])
+                resumed += 1
+        logging.info("Resume: %d rows already enriched per %s", resumed, journal_path)
+    elif os.path.exists(journal_path):
+        os.remove(journal_path)
+    journal = Journal(journal_path)
+
+    todo, plan = plan_enrichment(rows, limit=limit, ttl_days=reverify_ttl_days)
+    todo_set = set(todo)
+    for i, row in enumerate(rows):
+        if i in todo_set:
+            continue
+        # No URL to check, or a phone read from the place page recently enough (scraper detail panel).
+        if not (row.get("profile_url") or "").strip() or row.get("phone_verified_at"):
             row["phone_verified"] = "TRUE"
-            updated += 1
-
-            if updated % 20 == 0:
-                logging.info("Progress: processed=%d / total=%d", batch_idx + 1, len(rows_to_process))
-                write_csv(output_csv, fieldnames, rows)
+    logging.info("Enrichment plan: visiting %d of %d rows | %s", len(todo), len(rows),
+                 ", ".join(f"{k}={v}" for k, v in sorted(plan.items())))
+
+    proxies = ProxyPool.from_file(proxy_file, name="enricher") if proxy_file else None
+    concurrency = max(1, min(concurrency, len(todo) or 1))
+
+    def launch():
+        proxy = proxies.pick() if proxies is not None else None
+        # uc patches a shared chromedriver on launch; workers take turns starting Chrome.
+        with LAUNCH_LOCK:
+            driver = new_driver(headless=headless, proxy=proxy)
+        return attach_proxy(driver, proxies, proxy)
+
+    # A warm spare per worker would double the Chrome count; only the single-worker run keeps one.
+    pools = [BrowserPool(launch, name=f"enricher-{i}" if concurrency > 1 else "enricher",
+                         max_uses=PHONE_RESTART_EVERY, spare=BROWSER_SPARE and concurrency == 1)
+             for i in range(concurrency)]
+    work: "queue.Queue[EnrichItem]" = queue.Queue()
+    results: "queue.Queue[Tuple[int, int, Optional[str]]]" = queue.Queue()
+    for seq, idx in enumerate(todo):
+        row = rows[idx]
+        work.put(EnrichItem(seq, idx, (row.get("profile_url") or "").strip(),
+                            (row.get("query_location") or "").strip(),
+                            has_phone=bool((row.get("phone_e164") or row.get("phone") or "").strip())))
+    stop = threading.Event()
+    fasts = [HttpPhoneFetcher(proxies=proxies) if http_fast_path else None for _ in pools]
+    threads = [threading.Thread(target=enrich_worker, args=(pool, proxies, work, results, stop, fast),
+                                name=pool.name, daemon=True) for pool, fast in zip(pools, fasts)]
+    for t in threads:
+        t.start()
+    if concurrency > 1:
+        logging.info("Enriching with %d browser workers", concurrency)
+
+    updated = failed = 0
+    pending: Dict[int, Tuple[int, Optional[str], str]] = {}
+    next_seq = 0
+    try:
+        while next_seq < len(todo):
+            try:
+                seq, idx, raw_phone = results.get(timeout=1.0)
+            except queue.Empty:
+                if not any(t.is_alive() for t in threads):
+                    logging.error("All enrichment workers stopped; %d planned rows left unverified",
+                                  len(todo) - next_seq)
+                    break
+                continue
+            phone, verified_at = None, ""
+            if raw_phone is not None:
+                location = (rows[idx].get("query_location") or "").strip()
+                phone = normalize_phone_international(raw_phone, location) if raw_phone else ""
+                verified_at = verified_at_now()
+                # Journal on arrival so a crash keeps every finished result, even ones
+                # still waiting behind a re-queued row; merged into the CSV once below.
+                journal.append({"e": (rows[idx].get("profile_url") or "").strip(), "p": phone, "at": verified_at})
+                journal.commit()
+            pending[seq] = (idx, phone, verified_at)
+            # Single writer: apply results in input order whatever order the workers finish in.
+            while next_seq in pending:
+                idx, phone, verified_at = pending.pop(next_seq)
+                next_seq += 1
+                if phone is None:
+                    failed += 1  # left unverified for the next run
+                    continue
+                set_phone(rows[idx], phone, verified_at)
+                updated += 1
+
+                if updated % 20 == 0:
+                    logging.info("Progress: visited=%d / planned=%d", next_seq, len(todo))
 
         write_csv(output_csv, fieldnames, rows)
-        logging.info("Phone enrichment done. Total rows processed: %d", updated)
+        logging.info("Phone enrichment done. Visited: %d | failed: %d | skipped: %d | deferred by limit: %d | "
+                     "pacing: %s", updated, failed, plan["skipped"], plan["deferred"], PACER.status())
 
     finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
+        stop.set()
+        for t in threads:
+            t.join()
+        journal.close()
+        for pool in pools:
+            pool.close()
+        for fast in fasts:
+            if fast is not None:
+                logging.info("HTTP fast path: %s", fast.status())
+                fast.close()
+        if proxies is not None:
+            proxies.log_summary()
 
 
 def main():
@@ -303,6 +545,12 @@ def main():
     ap.add_argument("--out", dest="out", required=True)
     ap.add_argument("--limit", type=int, default=PHONE_ENRICH_LIMIT)
     ap.add_argument("--no-headless", action="store_true")
+    ap.add_argument("--proxy-file", default=PROXY_FILE, help="File with one proxy per line")
+    ap.add_argument("--reverify-days", type=float, default=PHONE_REVERIFY_TTL_DAYS,
+                    help="Re-check phones verified longer ago than this (0 = never)")
+    ap.add_argument("--concurrency", type=int, default=ENRICH_CONCURRENCY, help="Browser workers")
+    ap.add_argument("--no-http", action="store_true", help="Skip the browserless fast path; use Chrome for every row")
+    ap.add_argument("--resume", action="store_true", help="Reuse results journaled by an interrupted run")
     ap.add_argument("--log", dest="log", default=LOG_LEVEL)
     args = ap.parse_args()
 
@@ -315,7 +563,9 @@ def main():
             logging.StreamHandler(stream=sys.stdout),
         ],
     )
-    process(args.inp, args.out, limit=args.limit, headless=not args.no_headless)
+    process(args.inp, args.out, limit=args.limit, headless=not args.no_headless, proxy_file=args.proxy_file,
+            reverify_ttl_days=args.reverify_days, concurrency=args.concurrency,
+            http_fast_path=HTTP_PHONE_FAST_PATH and not args.no_http, resume=args.resume)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import logging, random, sys, threading, time
+from typing import Dict, List, Optional
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config import PROXY_COOLDOWN_SECS, PROXY_QUARANTINE_AFTER, PACING_SLOW_SECS
+
+
+def load_proxies(path: str) -> List[str]:
+    """One proxy per line (``scheme://[user:pass@]host:port``); blank lines and ``#`` comments are skipped."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [ln.strip() for ln in f if ln.strip() and not ln.lstrip().startswith("#")]
+
+
+class ProxyStats:
+    def __init__(self, proxy: str):
+        self.proxy = proxy
+        self.ok = 0
+        self.fail = 0
+        self.blocks = 0
+        self.leases = 0
+        self.latency = None  # EWMA of successful navigation seconds
+        self.streak = 0  # consecutive failures/blocks
+        self.quarantines = 0
+        self.until = 0.0
+
+    def score(self, slow_secs: float) -> float:
+        # Laplace-smoothed success rate, blocks weigh double, slow egress is discounted.
+        rate = (self.ok + 1) / (self.ok + self.fail + 2 * self.blocks + 2)
+        lat = self.latency if self.latency is not None else slow_secs / 2
+        return rate / (1.0 + lat / slow_secs)
+
+
+class ProxyPool:
+    """Weighted proxy choice with health scoring and quarantine.
+
+    Each browser launch takes a proxy via ``pick``, weighted by its score
+    (success rate, block count, navigation latency). Outcomes come back
+    through ``report``; a block, or ``quarantine_after`` failures in a row,
+    benches the proxy for ``cooldown`` seconds, doubling on every repeat.
+    """
+
+    def __init__(self, proxies: List[str], name: str = "proxies", cooldown: float = PROXY_COOLDOWN_SECS,
+                 quarantine_after: int = PROXY_QUARANTINE_AFTER, slow_secs: float = PACING_SLOW_SECS):
+        if not proxies:
+            raise ValueError("ProxyPool needs at least one proxy")
+        self.name = name
+        self.cooldown = cooldown
+        self.quarantine_after = quarantine_after
+        self.slow_secs = slow_secs
+        self.stats: Dict[str, ProxyStats] = {p: ProxyStats(p) for p in proxies}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str, name: str = "proxies") -> "ProxyPool":
+        proxies = load_proxies(path)
+        logging.info("Proxy pool[%s]: %d proxies from %s", name, len(proxies), path)
+        return cls(proxies, name=name)
+
+    def pick(self) -> str:
+        now = time.time()
+        with self._lock:
+            live = [s for s in self.stats.values() if s.until <= now]
+            if not live:
+                # Everything is benched: take whichever comes back first rather than stall.
+                s = min(self.stats.values(), key=lambda x: x.until)
+                logging.warning("Proxy pool[%s]: all proxies quarantined; reusing %s early", self.name, s.proxy)
+            else:
+                s = random.choices(live, weights=[x.score(self.slow_secs) for x in live])[0]
+            s.leases += 1
+            return s.proxy
+
+    def report(self, proxy: Optional[str], ok: bool, latency: Optional[float] = None, blocked: bool = False) -> None:
+        s = self.stats.get(proxy or "")
+        if s is None:
+            return
+        with self._lock:
+            if ok:
+                s.ok += 1
+                s.streak = 0
+                if latency is not None:
+                    s.latency = latency if s.latency is None else 0.7 * s.latency + 0.3 * latency
+                return
+            if blocked:
+                s.blocks += 1
+            else:
+                s.fail += 1
+            s.streak += 1
+            if blocked or s.streak >= self.quarantine_after:
+                s.quarantines += 1
+                s.streak = 0
+                bench = self.cooldown * 2 ** (s.quarantines - 1)
+                s.until = time.time() + bench
+                logging.warning("Proxy pool[%s]: quarantining %s for %.0fs (%s)", self.name, s.proxy, bench,
+                                "blocked" if blocked else "failures")
+
+    def quarantined(self, proxy: Optional[str]) -> bool:
+        s = self.stats.get(proxy or "")
+        return s is not None and s.until > time.time()
+
+    def summary(self) -> List[str]:
+        lines = []
+        for s in sorted(self.stats.values(), key=lambda x: -x.score(self.slow_secs)):
+            lat = f"{s.latency:.1f}s" if s.latency is not None else "-"
+            lines.append(f"{s.proxy}: leases={s.leases} ok={s.ok} fail={s.fail} blocks={s.blocks} "
+                         f"latency={lat} quarantines={s.quarantines} score={s.score(self.slow_secs):.2f}")
+        return lines
+
+    def log_summary(self) -> None:
+        for line in self.summary():
+            logging.info("Proxy pool[%s]: %s", self.name, line)
+
+
+def attach_proxy(driver, pool: Optional[ProxyPool], proxy: Optional[str]):
+    """Remember which pool proxy ``driver`` was launched with, for ``report_proxy``."""
+    if pool is not None and driver is not None:
+        driver._lead_proxy = (pool, proxy)
+    return driver
+
+
+def driver_proxy(driver) -> Optional[str]:
+    info = getattr(driver, "_lead_proxy", None)
+    return info[1] if info else None
+
+
+def report_proxy(driver, ok: bool, latency: Optional[float] = None, blocked: bool = False) -> None:
+    info = getattr(driver, "_lead_proxy", None)
+    if info:
+        info[0].report(info[1], ok, latency=latency, blocked=blocked)
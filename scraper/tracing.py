@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import functools, json, logging, os, threading, time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(q * (len(s) - 1))))]
+
+
+class Tracer:
+    """In-process span timer for the scraper hot loop.
+
+    ``span(phase)`` times a block, ``count_roundtrip`` is bumped by the
+    wrapped ``driver.execute`` (see ``instrument_driver``), and
+    ``place_done`` closes one saved place, attributing the WebDriver round
+    trips since the previous place to it. With ``open(path)`` every span and
+    place is also appended to a JSONL trace file; ``summary`` gives p50/p95
+    per phase and places/minute per category. Spans nest: a phase is charged
+    only its self time (``self_ms``), so a ``jitter`` inside ``navigate`` is
+    not counted twice in the totals.
+    """
+
+    def __init__(self, name: str = "trace"):
+        self.name = name
+        self.durations: Dict[str, List[float]] = {}
+        self.categories: Dict[str, Dict[str, float]] = {}
+        self.roundtrips = 0
+        self._place_mark = 0
+        self._category: Optional[str] = None
+        self._f = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def open(self, path: str) -> None:
+        self._f = open(path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def _emit(self, rec: Dict[str, Any]) -> None:
+        if self._f is None:
+            return
+        line = json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+
+    def count_roundtrip(self) -> None:
+        self.roundtrips += 1
+
+    @contextmanager
+    def span(self, phase: str, **attrs) -> Iterator[None]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        started = time.time()
+        rt = self.roundtrips
+        stack.append(0.0)  # seconds spent in nested spans
+        try:
+            yield
+        finally:
+            secs = time.time() - started
+            own = secs - stack.pop()
+            if stack:
+                stack[-1] += secs
+            with self._lock:
+                self.durations.setdefault(phase, []).append(own)
+            self._emit({"ts": round(started, 3), "span": phase, "ms": round(secs * 1000, 1),
+                        "self_ms": round(own * 1000, 1), "rt": self.roundtrips - rt, "cat": self._category,
+                        **attrs})
+
+    def wrap(self, phase: str):
+        """Decorator form of ``span``."""
+        def deco(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                with self.span(phase):
+                    return fn(*args, **kwargs)
+            return inner
+        return deco
+
+    @contextmanager
+    def category(self, name: str) -> Iterator[None]:
+        self._category = name
+        started = time.time()
+        stats = self.categories.setdefault(name, {"places": 0, "secs": 0.0, "rt": 0})
+        rt = self.roundtrips
+        self._place_mark = rt
+        try:
+            yield
+        finally:
+            stats["secs"] += time.time() - started
+            stats["rt"] += self.roundtrips - rt
+            self._category = None
+
+    def place_done(self, url: str = "") -> None:
+        rt, self._place_mark = self.roundtrips - self._place_mark, self.roundtrips
+        if self._category is not None:
+            self.categories[self._category]["places"] += 1
+        self._emit({"ts": round(time.time(), 3), "place": url, "rt": rt, "cat": self._category})
+
+    def summary(self) -> List[str]:
+        lines = []
+        for phase, ds in sorted(self.durations.items(), key=lambda kv: -sum(kv[1])):
+            lines.append(f"{phase}: n={len(ds)} total={sum(ds):.1f}s p50={percentile(ds, 0.5):.2f}s "
+                         f"p95={percentile(ds, 0.95):.2f}s")
+        for cat, st in self.categories.items():
+            mins = st["secs"] / 60.0
+            rate = st["places"] / mins if mins > 0 else 0.0
+            per_place = st["rt"] / st["places"] if st["places"] else st["rt"]
+            lines.append(f"[{cat}] places={st['places']:.0f} in {mins:.1f}min = {rate:.1f}/min | "
+                         f"webdriver round trips/place={per_place:.0f}")
+        return lines
+
+    def log_summary(self) -> None:
+        for line in self.summary():
+            logging.info("Trace[%s]: %s", self.name, line)
+
+
+def instrument_driver(driver, tracer: Tracer):
+    """Count every WebDriver command ``driver`` sends (elements share the parent's ``execute``)."""
+    if getattr(driver, "_traced", False):
+        return driver
+    orig = driver.execute
+
+    def execute(driver_command, params=None):
+        tracer.count_roundtrip()
+        return orig(driver_command, params)
+
+    driver.execute = execute
+    driver._traced = True
+    return driver
+
+
+def worker_trace_path(path: str, worker_id: int) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.w{worker_id}{ext or '.jsonl'}"
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from scraper.browser_pool import BrowserPool, process_tree_rss_mb, record_driver_error
+
+
+class FakeDriver:
+    launched = 0
+
+    def __init__(self):
+        FakeDriver.launched += 1
+        self.id = FakeDriver.launched
+        self.alive = True
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("chrome not reachable")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_lease_reuses_driver_until_max_uses():
+    pool = BrowserPool(FakeDriver, max_uses=2, spare=False)
+    ids = []
+    for _ in range(4):
+        with pool.lease() as lease:
+            ids.append(lease.driver.id)
+    pool.close()
+    assert ids[0] == ids[1] != ids[2] == ids[3]
+    assert pool.recycles == 2
+
+
+def test_failed_probe_replaces_driver():
+    pool = BrowserPool(FakeDriver, spare=False)
+    with pool.lease() as lease:
+        first = lease.driver
+    first.alive = False
+    with pool.lease() as lease:
+        assert lease.driver is not first
+    pool.close()
+
+
+def test_handled_errors_reported_through_the_driver_recycle_it():
+    pool = BrowserPool(FakeDriver, max_errors=2, spare=False)
+    with pool.lease() as lease:
+        first = lease.driver
+        record_driver_error(first)
+    with pool.lease() as lease:
+        assert lease.driver is first
+        record_driver_error(first)
+    with pool.lease() as lease:
+        assert lease.driver is not first
+    record_driver_error(object())  # drivers outside a pool are ignored
+    pool.close()
+
+
+def test_errors_and_spare_promotion():
+    pool = BrowserPool(FakeDriver, max_errors=1, spare=True)
+    with pytest.raises(ValueError):
+        with pool.lease() as lease:
+            first = lease.driver
+            raise ValueError("boom")
+    with pool.lease() as lease:
+        assert lease.driver is not first
+    assert pool.recycles == 1
+    pool.close()
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="needs /proc")
+def test_process_tree_rss_reads_proc():
+    assert process_tree_rss_mb(os.getpid()) > 0
+    assert process_tree_rss_mb(0) is None
+
+
+def test_startup_times_are_recorded():
+    pool = BrowserPool(FakeDriver, spare=False)
+    assert pool.startup_summary() == "no launches"
+    with pool.lease():
+        pass
+    pool.close()
+    assert len(pool.launch_secs) == 1
+    assert pool.startup_summary().startswith("1 launches")
@@ -0,0 +1,112 @@
+import os
+import time
+
+import browser_utils
+
+
+def test_chrome_major_probes_once_per_host(tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_utils, "BROWSER_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(browser_utils, "_probe_memo", {})
+    calls = []
+
+    def probe():
+        calls.append(1)
+        return 124
+
+    assert browser_utils.chrome_major(probe) == 124
+    assert browser_utils.chrome_major(probe) == 124
+    assert len(calls) == 1
+
+    # A new process starts with an empty memo but finds the persisted probe.
+    monkeypatch.setattr(browser_utils, "_probe_memo", {})
+    assert browser_utils.chrome_major(probe) == 124
+    assert len(calls) == 1
+    assert os.path.exists(tmp_path / browser_utils.PROBE_CACHE_FILE)
+
+
+def test_profile_template_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_utils, "BROWSER_CACHE_DIR", str(tmp_path / "cache"))
+    used = tmp_path / "used"
+    (used / "Default" / "Cache").mkdir(parents=True)
+    (used / "Default" / "Cache" / "data_0").write_text("x")
+    (used / "Default" / "Preferences").write_text("{}")
+    (used / "Default" / "Cookies").write_text("NID")
+    (used / "Default" / "Cookies-journal").write_text("")
+    (used / "Default" / "Local Storage").mkdir()
+    (used / "SingletonLock").write_text("")
+
+    assert browser_utils.save_profile_template(str(used))
+    assert not browser_utils.save_profile_template(str(used))
+
+    fresh = tmp_path / "fresh"
+    fresh.mkdir()
+    assert browser_utils.seed_profile(str(fresh))
+    assert (fresh / "Default" / "Preferences").read_text() == "{}"
+    assert not (fresh / "Default" / "Cookies").exists()
+    assert not (fresh / "Default" / "Cookies-journal").exists()
+    assert not (fresh / "Default" / "Local Storage").exists()
+    assert not (fresh / "Default" / "Cache").exists()
+    assert not (fresh / "SingletonLock").exists()
+
+
+def test_expired_profile_template_is_ignored_and_replaced(tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_utils, "BROWSER_CACHE_DIR", str(tmp_path / "cache"))
+    used = tmp_path / "used"
+    (used / "Default").mkdir(parents=True)
+    (used / "Default" / "Preferences").write_text("old")
+    assert browser_utils.save_profile_template(str(used))
+    template = browser_utils.profile_template_path()
+    stale = time.time() - (browser_utils.BROWSER_TEMPLATE_TTL_HOURS + 1) * 3600
+    os.utime(template, (stale, stale))
+
+    assert not browser_utils.seed_profile(str(tmp_path / "fresh"))
+    (used / "Default" / "Preferences").write_text("new")
+    assert browser_utils.save_profile_template(str(used))
+    assert (tmp_path / "cache" / browser_utils.PROFILE_TEMPLATE_DIR / "Default" / "Preferences").read_text() == "new"
+
+
+def test_patched_chromedriver_without_local_driver(tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_utils, "BROWSER_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(browser_utils.shutil, "which", lambda name: None)
+    assert browser_utils.patched_chromedriver(124) is None
+
+
+class CdpDriver:
+    def __init__(self):
+        self.calls = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.calls.append((cmd, params))
+
+
+def test_block_resources_switches_profiles_once():
+    d = CdpDriver()
+    assert browser_utils.block_resources(d, "scraper-list")
+    assert browser_utils.block_resources(d, "scraper-list")
+    assert browser_utils.block_resources(d, "scraper-detail")
+    cmds = [c for c, _ in d.calls]
+    assert cmds == ["Network.enable", "Network.setBlockedURLs", "Network.setBlockedURLs"]
+    assert d.calls[-1][1]["urls"] == browser_utils.block_patterns("scraper-detail")
+
+
+def test_block_profiles_spare_pages_and_search_payloads():
+    from fnmatch import fnmatch
+
+    needed = [
+        "https://www.google.com/maps/search/cafes+in+Cairo?hl=en",
+        "https://www.google.com/search?tbm=map&authuser=0&hl=en&q=cafes",
+        "https://www.google.com/maps/place/X/data=!4m7!3m6!1s0x1:0x2",
+        "https://www.google.com/maps/_/js/k=maps.m.en.abc/m=sc2,per/rt=j",
+    ]
+    blocked = [
+        "https://lh5.googleusercontent.com/p/AF1Qip=w408-h306",
+        "https://www.google.com/maps/vt?pb=!1m5!1m4!1i12",
+        "https://fonts.gstatic.com/s/roboto/v30/font.woff2",
+        "https://www.google.com/gen_204?atyp=csi",
+    ]
+    for profile in browser_utils.BLOCK_PROFILES:
+        pats = browser_utils.block_patterns(profile)
+        for url in needed:
+            assert not any(fnmatch(url, p) for p in pats), (profile, url)
+        for url in blocked:
+            assert any(fnmatch(url, p) for p in pats), (profile, url)
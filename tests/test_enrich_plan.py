@@ -0,0 +1,38 @@
+import calendar
+import time
+
+from scraper.enrich_plan import enrich_reason, parse_verified_at, plan_enrichment
+
+NOW = float(calendar.timegm(time.strptime("2026-06-01T00:00:00Z", "%Y-%m-%dT%H:%M:%SZ")))
+URL = "https://www.google.com/maps/place/x"
+
+
+def test_parse_verified_at_accepts_csv_and_supabase_forms():
+    assert parse_verified_at("2026-06-01T00:00:00Z") == NOW
+    assert parse_verified_at("2026-06-01T00:00:00.123+00:00") == NOW
+    assert parse_verified_at("") is None
+    assert parse_verified_at("yesterday") is None
+
+
+def test_enrich_reason():
+    fresh = "2026-05-20T00:00:00Z"
+    old = "2025-01-01T00:00:00Z"
+    assert enrich_reason({"profile_url": URL}, NOW, 90) == "unverified"
+    assert enrich_reason({"profile_url": URL, "phone": "+44", "phone_verified_at": fresh}, NOW, 90) == ""
+    assert enrich_reason({"profile_url": URL, "phone": "+44", "phone_verified_at": old}, NOW, 90) == "stale"
+    assert enrich_reason({"profile_url": URL, "phone": "+44", "phone_verified_at": old}, NOW, 0) == ""
+    assert enrich_reason({"profile_url": URL, "phone_verified": "TRUE", "phone": "+44"}, NOW, 90) == ""
+    assert enrich_reason({"profile_url": URL, "phone_verified": "True"}, NOW, 90) == "missing phone"
+    assert enrich_reason({"profile_url": ""}, NOW, 90) == ""
+
+
+def test_plan_enrichment_counts_and_limit():
+    rows = [
+        {"profile_url": URL, "phone_e164": "+44", "phone_verified_at": "2026-05-30T00:00:00Z"},
+        {"profile_url": URL},
+        {"profile_url": URL},
+        {"profile_url": URL, "phone": "+44", "phone_verified": "TRUE", "phone_verified_at": "2025-01-01T00:00:00Z"},
+    ]
+    todo, counts = plan_enrichment(rows, limit=2, ttl_days=90, now=NOW)
+    assert todo == [1, 2]
+    assert counts == {"skipped": 1, "deferred": 1, "unverified": 2}
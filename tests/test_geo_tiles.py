@@ -0,0 +1,27 @@
+import pytest
+
+from scraper.geo_tiles import Tile, parse_viewport, plan_grid, subdivide, viewport_span
+
+
+def test_parse_viewport_from_redirected_url():
+    tile = parse_viewport("https://www.google.com/maps/place/London,+UK/@51.5285262,-0.2664031,10z/data=!3m1")
+    assert tile == Tile(51.5285262, -0.2664031, 10.0)
+    assert parse_viewport("https://www.google.com/maps/search/cafes") is None
+
+
+def test_plan_grid_covers_the_viewport():
+    center = Tile(30.0444, 31.2357, 12.0)
+    tiles = plan_grid(center, 3)
+    assert len(tiles) == 9
+    lat_span, lng_span = viewport_span(center.lat, center.zoom)
+    assert min(t.lng for t in tiles) == pytest.approx(center.lng - lng_span / 3, abs=1e-5)
+    assert max(t.lat for t in tiles) == pytest.approx(center.lat + lat_span / 3, abs=1e-5)
+    assert all(t.zoom == pytest.approx(12.0 + 1.585, abs=1e-3) for t in tiles)
+
+
+def test_subdivide_goes_one_level_deeper():
+    children = subdivide(Tile(30.0, 31.0, 13.0, depth=1))
+    assert len(children) == 4
+    assert {c.zoom for c in children} == {14.0}
+    assert {c.depth for c in children} == {2}
+    assert children[0].url_fragment().startswith("@")
@@ -0,0 +1,124 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip("requests")
+
+from scraper.http_phone import HttpPhoneFetcher, parse_phone_html
+from scraper.proxy_pool import ProxyPool
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "http_phone"
+
+
+def fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+RICHE = "/maps/place/Cafe+Riche/data=!4m2!3m1!1s0x14583fa2ac8e7a5b:0x7b1f1c2d3e4f5a6b"
+BELL = "/maps/place/The+Old+Bell/data=!4m2!3m1!1s0x1:0x2"
+QUIET = "/maps/place/Quiet+Park/data=!4m2!3m1!1s0x3:0x4"
+OTHER = "/maps/place/Nile+View/data=!4m2!3m1!1s0x5:0x6"
+
+
+def test_parse_phone_html_from_saved_pages():
+    assert parse_phone_html(fixture("place_item_id.html"), RICHE) == "+20223929793"
+    assert parse_phone_html(fixture("place_tel_href.html"), BELL) == "+44 20 7583 0216"
+    assert parse_phone_html(fixture("place_state.html"), RICHE) == "+20 2 23929793"
+    assert parse_phone_html(fixture("place_no_phone.html"), QUIET) == ""
+    assert parse_phone_html("", RICHE) == ""
+
+
+def test_parse_phone_html_rejects_another_places_phone():
+    # Markup titled with a different place, or a state record with a different data id.
+    assert parse_phone_html(fixture("place_item_id.html"), OTHER) == ""
+    assert parse_phone_html(fixture("place_tel_href.html"), OTHER) == ""
+    assert parse_phone_html(fixture("place_state.html"), OTHER) == ""
+    assert parse_phone_html(fixture("place_state.html"), "/maps/place/Cafe+Riche/data=!4m2!3m1!1s0x7:0x8") == ""
+    # A page listing two phones cannot say which one is ours.
+    two = fixture("place_item_id.html").replace("</div>\n</body>", '<button data-item-id="phone:tel:+201000"></button></div>\n</body>')
+    assert parse_phone_html(two, RICHE) == ""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    peers = set()
+
+    def do_GET(self):
+        _Handler.peers.add(self.client_address)
+        path = urlparse(self.path).path  # absolute-form when the client talks to us as a proxy
+        if path.startswith("/forbidden"):
+            self.send_error(403)
+            return
+        if path.startswith("/blocked"):
+            self.send_response(302)
+            self.send_header("Location", "/sorry/index")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        # Place URLs carry the fixture to serve as ?f=<name>.
+        query = parse_qs(urlparse(self.path).query)
+        name = "sorry.html" if path.startswith("/sorry/") else query.get("f", [""])[0]
+        page = FIXTURES / name
+        if not page.is_file():
+            self.send_error(404)
+            return
+        body = page.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.peers = set()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    t = threading.Thread(target=httpd.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_fetch_reuses_one_connection_and_falls_back_on_misses(server):
+    fast = HttpPhoneFetcher(timeout=5)
+    assert fast.fetch(f"{server}{RICHE}?f=place_item_id.html") == "+20223929793"
+    assert fast.fetch(f"{server}{RICHE}?f=place_state.html") == "+20 2 23929793"
+    assert fast.fetch(f"{server}{QUIET}?f=place_no_phone.html") is None
+    assert fast.fetch(f"{server}{OTHER}?f=place_item_id.html") is None
+    assert fast.fetch(f"{server}{RICHE}?f=missing.html") is None
+    assert (fast.hits, fast.misses) == (2, 3)
+    assert len(_Handler.peers) == 1  # keep-alive: every request rode the same socket
+    fast.close()
+
+
+def test_block_pages_switch_the_fast_path_off(server):
+    fast = HttpPhoneFetcher(timeout=5, max_blocks=2)
+    assert fast.fetch(f"{server}/blocked") is None
+    assert fast.enabled
+    assert fast.fetch(f"{server}/blocked") is None
+    assert not fast.enabled
+    assert fast.fetch(f"{server}{RICHE}?f=place_item_id.html") is None  # browser only from here on
+    fast.close()
+
+
+def test_fast_path_reports_to_the_proxy_pool_and_leaves_a_blocked_proxy(server):
+    port = server.rsplit(":", 1)[1]
+    pool = ProxyPool([f"http://127.0.0.1:{port}", f"http://localhost:{port}"], cooldown=60)
+    fast = HttpPhoneFetcher(timeout=5, proxies=pool)
+    first = fast.proxy
+    assert fast.fetch(f"{server}{RICHE}?f=place_item_id.html") == "+20223929793"
+    assert pool.stats[first].ok == 1 and pool.stats[first].latency is not None
+    assert fast.fetch(f"{server}{RICHE}?f=missing.html") is None  # a 404 is no success for the proxy
+    assert (pool.stats[first].ok, pool.stats[first].fail) == (1, 1)
+    assert fast.fetch(f"{server}/forbidden") is None
+    assert pool.stats[first].blocks == 1 and pool.quarantined(first)
+    assert fast.proxy != first
+    fast.close()
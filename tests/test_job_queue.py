@@ -0,0 +1,79 @@
+import threading
+import time
+
+from db.job_queue import LeaseKeeper, open_queue
+
+
+def test_enqueue_skips_open_duplicates(tmp_path):
+    q = open_queue(str(tmp_path / "q.sqlite"))
+    assert q.enqueue([("Cairo", "cafe"), ("Cairo", "bar", 5.0)]) == 2
+    assert q.enqueue([("Cairo", "cafe")]) == 0
+    [job] = q.lease("w1")
+    assert job.category == "bar"  # highest priority first
+    q.complete(job.id, "w1", new_places=3)
+    assert q.enqueue([("Cairo", "bar")]) == 1  # finished combos can be queued again
+
+
+def test_two_workers_get_disjoint_leases(tmp_path):
+    url = "sqlite:///" + str(tmp_path / "q.sqlite")
+    open_queue(url).enqueue([("A", f"c{i}") for i in range(40)])
+    got = {}
+
+    def worker(name):
+        q = open_queue(url)
+        ids = []
+        while True:
+            jobs = q.lease(name, limit=3)
+            if not jobs:
+                break
+            ids += [j.id for j in jobs]
+        got[name] = ids
+        q.close()
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    ids = [i for v in got.values() for i in v]
+    assert len(ids) == 40 and len(set(ids)) == 40
+
+
+def test_expired_lease_is_reclaimed_and_heartbeat_keeps_it(tmp_path):
+    q = open_queue(str(tmp_path / "q.sqlite"))
+    q.enqueue([("A", "cafe"), ("A", "bar")])
+    jobs = q.lease("w1", limit=2, ttl=-1)  # already expired
+    assert q.heartbeat("w1", [jobs[0].id], ttl=600) == 1  # renewing puts the first back in date
+    [reclaimed] = q.lease("w2", limit=2)
+    assert reclaimed.id == jobs[1].id and reclaimed.attempts == 2
+    assert not q.complete(reclaimed.id, "w1")  # the old owner lost it
+    assert q.complete(reclaimed.id, "w2")
+
+
+def test_release_requeues_until_attempts_run_out(tmp_path):
+    q = open_queue(str(tmp_path / "q.sqlite"), max_attempts=2)
+    q.enqueue([("A", "cafe")])
+    for _ in range(2):
+        [job] = q.lease("w1")
+        q.release(job.id, "w1", "blocked")
+    assert q.lease("w1") == []
+    assert q.counts() == {"failed": 1}
+
+
+def test_lease_by_location(tmp_path):
+    q = open_queue(str(tmp_path / "q.sqlite"))
+    q.enqueue([("A", "cafe"), ("B", "cafe"), ("A", "bar")])
+    jobs = q.lease("w1", limit=5, location="A")
+    assert sorted(j.category for j in jobs) == ["bar", "cafe"]
+    assert q.counts() == {"leased": 2, "queued": 1}
+
+
+def test_lease_keeper_renews_in_background(tmp_path):
+    url = str(tmp_path / "q.sqlite")
+    q = open_queue(url)
+    q.enqueue([("A", "cafe")])
+    [job] = q.lease("w1", ttl=0.3)
+    with LeaseKeeper(url, "w1", [job.id], ttl=0.3) as keeper:
+        time.sleep(0.6)
+        assert q.lease("w2") == []
+    assert not keeper.lost
@@ -0,0 +1,70 @@
+import csv
+
+from scraper.journal import (BufferedCsvWriter, Journal, category_key, journal_path_for, load_enrichment,
+                             load_run_state)
+
+
+def test_writer_journals_only_flushed_rows(tmp_path):
+    out = str(tmp_path / "run_raw.csv")
+    w = BufferedCsvWriter(out, ["name", "profile_url"], flush_every=2, flush_secs=3600)
+    w.write({"name": "a", "profile_url": "https://maps/a"})
+    assert load_run_state(journal_path_for(out)) == (set(), set())
+    w.write({"name": "b", "profile_url": "https://maps/b"})
+    w.write({"name": "c", "profile_url": "https://maps/c"})
+    w.mark_done(category_key("Cairo, Egypt", "cafes"))
+    w.close()
+
+    urls, done = load_run_state(journal_path_for(out))
+    assert urls == {"https://maps/a", "https://maps/b", "https://maps/c"}
+    assert done == {"Cairo, Egypt|cafes"}
+    with open(out, encoding="utf-8-sig", newline="") as f:
+        assert [r["name"] for r in csv.DictReader(f)] == ["a", "b", "c"]
+
+
+def test_writer_appends_without_second_header(tmp_path):
+    out = str(tmp_path / "run_raw.csv")
+    for name in ("a", "b"):
+        with BufferedCsvWriter(out, ["name", "profile_url"]) as w:
+            w.write({"name": name, "profile_url": ""})
+    with open(out, encoding="utf-8-sig", newline="") as f:
+        assert [r["name"] for r in csv.DictReader(f)] == ["a", "b"]
+
+
+def test_journal_read_skips_torn_tail(tmp_path):
+    path = tmp_path / "x.journal"
+    path.write_text('{"u":"https://maps/a"}\n{"u":"https://ma', encoding="utf-8")
+    assert list(Journal.read(str(path))) == [{"u": "https://maps/a"}]
+
+
+def test_load_enrichment_last_record_wins(tmp_path):
+    path = str(tmp_path / "out.csv.journal")
+    j = Journal(path)
+    j.append({"e": "https://maps/a", "p": "", "at": "2026-01-01T00:00:00Z"})
+    j.append({"e": "https://maps/a", "p": "+4420", "at": "2026-01-02T00:00:00Z"})
+    j.append({"u": "https://maps/b"})  # scraper records are ignored
+    j.close()
+    assert load_enrichment(path) == {"https://maps/a": {"phone": "+4420", "verified_at": "2026-01-02T00:00:00Z"}}
+
+
+def test_first_journal_over_existing_csv_keeps_old_rows_deduped(tmp_path):
+    out = str(tmp_path / "run_raw.csv")
+    with open(out, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=["name", "profile_url"])
+        w.writeheader()
+        w.writerow({"name": "old", "profile_url": "https://maps/old"})
+    with BufferedCsvWriter(out, ["name", "profile_url"], existing_keys={"https://maps/old"}) as w:
+        w.write({"name": "new", "profile_url": "https://maps/new"})
+    # Second resume: the journal now exists and must still know the pre-journal row.
+    with BufferedCsvWriter(out, ["name", "profile_url"], existing_keys={"https://maps/ignored"}) as w:
+        pass
+    urls, _ = load_run_state(journal_path_for(out))
+    assert urls == {"https://maps/old", "https://maps/new"}
+
+
+def test_append_after_torn_tail_starts_a_new_line(tmp_path):
+    path = tmp_path / "x.journal"
+    path.write_text('{"u":"https://maps/a"}\n{"u":"https://ma', encoding="utf-8")
+    j = Journal(str(path))
+    j.append({"done": "Cairo, Egypt|cafes"})
+    j.close()
+    assert list(Journal.read(str(path))) == [{"u": "https://maps/a"}, {"done": "Cairo, Egypt|cafes"}]
@@ -0,0 +1,29 @@
+from scraper.known_places import KnownPlaceIndex, place_keys
+
+FEED_URL = (
+    "https://www.google.com/maps/place/Cafe+Riche/data=!4m7!3m6"
+    "!1s0x14583fa2ac8e7a5b:0x7b1f1c2d3e4f5a6b!8m2!3d30.05!4d31.24!16s%2Fg%2F1tdx!19sChIJW3qOrKI_WBQRa1pPPi0cH3s?rclk=1"
+)
+CLEANED_URL = "https://www.google.com/maps/place/?q=place_id:ChIJW3qOrKI_WBQRa1pPPi0cH3s"
+
+
+def test_place_keys_match_feed_and_cleaned_forms():
+    assert "pid:ChIJW3qOrKI_WBQRa1pPPi0cH3s" in place_keys(FEED_URL)
+    assert "did:0x14583fa2ac8e7a5b:0x7b1f1c2d3e4f5a6b" in place_keys(FEED_URL)
+    assert place_keys(CLEANED_URL) == ["pid:ChIJW3qOrKI_WBQRa1pPPi0cH3s"]
+    assert place_keys("https://www.google.com/maps/place/Foo?hl=en") == ["url:https://www.google.com/maps/place/Foo"]
+    assert place_keys("") == []
+
+
+def test_index_persists_across_connections(tmp_path):
+    path = str(tmp_path / "known.sqlite")
+    index = KnownPlaceIndex(path)
+    index.add(CLEANED_URL)
+    index.close()
+
+    index = KnownPlaceIndex(path)
+    assert FEED_URL in index
+    assert "https://www.google.com/maps/place/Other/data=!1s0x1:0x2" not in index
+    assert len(index) == 1
+    assert index.has_key("pid:ChIJW3qOrKI_WBQRa1pPPi0cH3s")
+    index.close()
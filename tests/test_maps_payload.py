@@ -0,0 +1,54 @@
+import json
+
+from scraper.maps_payload import ids_from_profile_url, parse_search_payload, place_keys, profile_url_for
+
+
+def _place(name, data_id, place_id, phone=None, website=None):
+    d = [None] * 179
+    d[2] = ["17 Talaat Harb St", "Cairo"]
+    d[4] = [None] * 7 + [4.5, 1203]
+    d[7] = [website] if website else None
+    d[9] = [None, None, 30.05, 31.24]
+    d[10] = data_id
+    d[11] = name
+    d[13] = ["Cafe", "Restaurant"]
+    d[78] = place_id
+    d[178] = [[phone]] if phone else None
+    entry = [None] * 15
+    entry[14] = d
+    return entry
+
+
+def test_parse_search_payload_reads_wrapped_response():
+    inner = [["cafes in cairo", [["meta"], _place("Cafe Riche", "0x1:0x2", "ChIJabc", "02 23929793", "https://caferiche.example/")]]]
+    body = ")]}'\n" + json.dumps({"c": 0, "d": ")]}'\n" + json.dumps(inner)})
+    [rec] = parse_search_payload(body)
+    assert rec["name"] == "Cafe Riche"
+    assert rec["data_id"] == "0x1:0x2"
+    assert rec["place_id"] == "ChIJabc"
+    assert rec["rating"] == "4.5"
+    assert rec["reviews_count"] == "1203"
+    assert rec["category_line"] == "Cafe"
+    assert rec["address"] == "17 Talaat Harb St, Cairo"
+    assert rec["phone"] == "02 23929793"
+    assert rec["website"] == "https://caferiche.example/"
+    assert (rec["lat"], rec["lng"]) == ("30.05", "31.24")
+
+
+def test_parse_search_payload_tolerates_garbage():
+    assert parse_search_payload("<html>not json</html>") == []
+    assert parse_search_payload(")]}'\n[[1, 2, [3]]]") == []
+
+
+def test_profile_url_round_trips_ids():
+    url = profile_url_for({"name": "Cafe Riche", "data_id": "0x1:0x2", "place_id": "ChIJabc"})
+    assert url.startswith("https://www.google.com/maps/place/Cafe+Riche/")
+    assert ids_from_profile_url(url) == ("0x1:0x2", "ChIJabc")
+
+
+def test_payload_and_feed_urls_share_a_seen_key():
+    feed = "https://www.google.com/maps/place/Cafe+Riche/data=!4m7!3m6!1s0x1:0xAB!8m2!3d30.0!4d31.2!16s%2Fg%2F1"
+    synthetic = profile_url_for({"name": "Cafe Riche", "data_id": "0x1:0xab", "place_id": "ChIJabc"})
+    assert feed != synthetic
+    assert set(place_keys(feed)) & set(place_keys(synthetic)) == {"did:0x1:0xab"}
+    assert place_keys("") == []
@@ -1,2 +1,224 @@
+from types import SimpleNamespace
+
+import pytest
+
+from scraper.known_places import KnownPlaceIndex
+
+
 def test_placeholder_maps_scraper():
     assert True
+
+
+maps_scraper = pytest.importorskip("scraper.maps_scraper")
+
+
+def test_card_basic_from_snapshot_parses_info_rows():
+    snap = {
+        "name": "Cafe Riche ",
+        "profile_url": "https://www.google.com/maps/place/Cafe+Riche/data=!4m7",
+        "info_rows": ["4.5(1,203)", "Cafe · 17 Talaat Harb St", "Open · Closes 11 pm", ""],
+    }
+    basic = maps_scraper.card_basic_from_snapshot(snap)
+    assert basic["name"] == "Cafe Riche"
+    assert basic["category_line"] == "Cafe"
+    assert basic["address_line"] == "17 Talaat Harb St"
+    assert basic["opening_hours"] == "Open · Closes 11 pm"
+    assert basic["phone"] == ""
+
+
+def test_parse_detail_snapshot_prefers_data_item_phone_and_splits_plus_code():
+    raw = {
+        "name": "Cafe Riche",
+        "rating": "4.5 stars",
+        "reviews": "(1,203)",
+        "hours": "Open · Closes 11 pm",
+        "address": "Address: 17 Talaat Harb St\nXV2G+4C Cairo",
+        "phone_item_id": "phone:tel:+20223929793",
+        "phone_href": "",
+        "phone_text": "02 23929793",
+        "website": "https://caferiche.example/",
+        "social": ["https://facebook.com/caferiche", "https://facebook.com/caferiche"],
+        "photos": ["//lh5.googleusercontent.com/p/a", "data:image/png;base64,x"],
+    }
+    detail = maps_scraper.parse_detail_snapshot(raw)
+    assert detail["rating"] == "4.5"
+    assert detail["reviews_count"] == "1203"
+    assert detail["phone"] == "+20223929793"
+    assert detail["plus_code"] == "XV2G+4C"
+    assert "XV2G+4C" not in detail["address"]
+    assert detail["social_links"] == "https://facebook.com/caferiche"
+    assert detail["photo_urls"] == "https://lh5.googleusercontent.com/p/a"
+
+
+class TabDriver:
+    """Fake driver whose tabs become ready after a tab-specific number of polls."""
+
+    def __init__(self, polls_until_ready):
+        self.polls_until_ready = polls_until_ready
+        self.current_window_handle = "main"
+        self.switch_to = self
+        self.pages = {}
+        self.polls = {}
+        self.opened = 0
+        self._block_profiles = {None: "scraper-list"}
+
+    def new_window(self, kind):
+        self.opened += 1
+        self.current_window_handle = f"tab{self.opened}"
+
+    def window(self, handle):
+        self.current_window_handle = handle
+
+    def execute_cdp_cmd(self, cmd, params):
+        pass
+
+    def execute_script(self, script, *args):
+        h = self.current_window_handle
+        if script == maps_scraper.TAB_NAVIGATE_JS:
+            self.pages[h] = args[0]
+            self.polls[h] = 0
+            return None
+        self.polls[h] += 1
+        return self.polls[h] >= self.polls_until_ready[self.pages[h].split("?")[0]]
+
+    def execute_async_script(self, script, *args):
+        return {"name": self.pages[self.current_window_handle].split("/")[-1].split("?")[0], "phone_href": "tel:+20123"}
+
+
+def test_tab_fetcher_extracts_in_completion_order(monkeypatch):
+    monkeypatch.setattr(maps_scraper, "jitter", lambda *a: None)
+    urls = {1: "https://maps/place/Slow", 2: "https://maps/place/Fast", 3: "https://maps/place/Next"}
+    d = TabDriver({urls[1]: 4, urls[2]: 1, urls[3]: 1})
+    fetcher = maps_scraper.TabDetailFetcher(d, tabs=2)
+    assert d.current_window_handle == "main"
+    results = fetcher.fetch(sorted(urls.items()))
+    assert d.current_window_handle == "main"
+    assert list(results) == [2, 3, 1]
+    assert results[1]["name"] == "Slow"
+    assert d.pages[fetcher.handles[0]].endswith("hl=en")
+
+
+def test_scroll_yield_stops_on_known_batches_and_enough_new():
+    known = set()
+    for i in range(20):
+        maps_scraper.mark_seen(known, f"https://www.google.com/maps/place/K{i}")
+    tracker = maps_scraper.ScrollYield(known, max_places=0, min_yield=0.2, patience=2)
+    assert tracker.update([f"https://www.google.com/maps/place/K{i}?hl=en" for i in range(7)]) == ""
+    assert tracker.update([f"https://www.google.com/maps/place/K{i}" for i in range(7, 14)]).startswith("low-yield x2")
+
+    tracker = maps_scraper.ScrollYield(known, max_places=5, min_yield=0.2, patience=2)
+    assert tracker.update(["https://www.google.com/maps/place/N1", "https://www.google.com/maps/place/K1"]) == ""
+    assert tracker.update([f"https://www.google.com/maps/place/N{i}" for i in range(1, 6)]).startswith("enough-new")
+    assert tracker.cards == 7 and len(tracker.fresh) == 5
+
+
+def test_tiled_harvest_keeps_going_but_reports_a_tile_that_did_not_load(monkeypatch):
+    monkeypatch.setattr(maps_scraper, "jitter", lambda *a: None)
+    monkeypatch.setattr(maps_scraper, "resolve_location_viewport", lambda d, loc: maps_scraper.Tile(30.0, 31.0, 12.0))
+    calls = []
+
+    def harvest(driver, category, location, seen, max_places, emit, tile=None, stats=None, **kw):
+        calls.append(tile)
+        if len(calls) == 2:
+            raise maps_scraper.NavigationFailed("boom")
+        return 1
+
+    monkeypatch.setattr(maps_scraper, "harvest_category", harvest)
+    with pytest.raises(maps_scraper.NavigationFailed, match="1 of 4 tiles"):
+        maps_scraper.harvest_category_tiled(None, "cafes", "Cairo", set(), 100, lambda p: None, grid=2)
+    assert len(calls) == 4
+
+
+class NavDriver:
+    current_url = "https://www.google.com/maps/place/Cafe+Riche/data=!4m7!3m6!1s0x14583fa2c1bd3c2b:0x9e0f1e1f3b1f0a7c"
+
+    def execute_cdp_cmd(self, cmd, params):
+        pass
+
+    def get(self, url):
+        pass
+
+
+def test_navigation_reports_empty_and_place_but_raises_on_a_block(monkeypatch):
+    monkeypatch.setattr(maps_scraper, "BREAKER", maps_scraper.CircuitBreaker("test"))
+    monkeypatch.setattr(maps_scraper, "PACER", maps_scraper.AdaptivePacer("test"))
+    states = iter(["empty", "place", "captcha"])
+    monkeypatch.setattr(maps_scraper, "wait_for_page_state", lambda *a: next(states))
+    assert maps_scraper.get_with_retry(NavDriver(), "https://maps/search/x") == "empty"
+    assert maps_scraper.get_with_retry(NavDriver(), "https://maps/search/x") == "place"
+    with pytest.raises(maps_scraper.NavigationFailed, match="captcha"):
+        maps_scraper.get_with_retry(NavDriver(), "https://maps/search/x")
+
+
+def test_search_that_opens_a_single_place_harvests_it(monkeypatch):
+    monkeypatch.setattr(maps_scraper, "block_resources", lambda *a: None)
+    monkeypatch.setattr(maps_scraper, "get_with_retry", lambda *a, **kw: "place")
+    monkeypatch.setattr(maps_scraper, "extract_detail", lambda d: {"name": "Cafe Riche", "phone": "+20223929793"})
+    saved, stats = [], {}
+    assert maps_scraper.harvest_category(NavDriver(), "cafes", "Cairo", set(), 10, saved.append, stats=stats) == 1
+    assert [p.name for p in saved] == ["Cafe Riche"]
+    assert stats == {"cards": 1}
+    seen = set()
+    maps_scraper.mark_seen(seen, saved[0].profile_url)
+    assert maps_scraper.harvest_category(NavDriver(), "cafes", "Cairo", seen, 10, saved.append) == 0
+
+
+class PoolDriver(NavDriver):
+    def execute(self, driver_command, params=None):
+        return {"value": None}
+
+    def execute_script(self, script, *args):
+        return 1
+
+    def quit(self):
+        pass
+
+
+def test_empty_search_is_still_marked_done(monkeypatch, tmp_path):
+    monkeypatch.setattr(maps_scraper, "BREAKER", maps_scraper.CircuitBreaker("test"))
+    monkeypatch.setattr(maps_scraper, "jitter", lambda *a: None)
+    monkeypatch.setattr(maps_scraper, "block_resources", lambda *a: None)
+    monkeypatch.setattr(maps_scraper, "save_profile_template", lambda *a: None)
+    monkeypatch.setattr(maps_scraper, "new_driver", lambda **kw: PoolDriver())
+    monkeypatch.setattr(maps_scraper, "wait_for_page_state", lambda *a: "empty")
+    args = SimpleNamespace(engine="dom", proxy_file="", proxy="", headless=True, workers=1, tiles=0,
+                           location="Cairo", output=str(tmp_path / "out.csv"), max_places=10,
+                           scroll_mode="observer", stream=False, detail_tabs=0)
+    done = {}
+    assert maps_scraper.run_categories(["ice rinks"], args, set(), emit=lambda p: None,
+                                       on_category_done=lambda cat, st: done.update({cat: st["new"]})) == 0
+    assert done == {"ice rinks": 0}
+
+
+def test_tiled_harvest_counts_empty_tiles_as_finished(monkeypatch):
+    monkeypatch.setattr(maps_scraper, "BREAKER", maps_scraper.CircuitBreaker("test"))
+    monkeypatch.setattr(maps_scraper, "jitter", lambda *a: None)
+    monkeypatch.setattr(maps_scraper, "block_resources", lambda *a: None)
+    monkeypatch.setattr(maps_scraper, "resolve_location_viewport", lambda d, loc: maps_scraper.Tile(30.0, 31.0, 12.0))
+    monkeypatch.setattr(maps_scraper, "extract_detail", lambda d: {"name": "Cafe Riche"})
+    states = iter(["empty", "place", "empty", "empty"])
+    monkeypatch.setattr(maps_scraper, "wait_for_page_state", lambda *a: next(states))
+    saved = []
+    assert maps_scraper.harvest_category_tiled(NavDriver(), "cafes", "Cairo", set(), 100, saved.append, grid=2) == 1
+    assert len(saved) == 1
+
+
+def test_only_panel_phones_are_stamped_verified():
+    url = "https://www.google.com/maps/place/Cafe+Riche/data=!4m7"
+    detail = {"name": "Cafe Riche", "phone": "+20223929793"}
+    assert maps_scraper.build_place("cafes", "Cairo", {}, detail, url, from_panel=True).phone_verified_at
+    payload = maps_scraper.build_place("cafes", "Cairo", {}, detail, url)
+    assert payload.phone == "+20223929793" and payload.phone_verified_at == ""
+
+
+def test_known_seen_asks_the_index_only_for_stored_keys(tmp_path):
+    index = KnownPlaceIndex(str(tmp_path / "known.sqlite"))
+    index.add("https://www.google.com/maps/place/?q=place_id:ChIJW3qOrKI_WBQRa1pPPi0cH3s")
+    asked = []
+    has_key = index.has_key
+    index.has_key = lambda key: asked.append(key) or has_key(key)
+    seen = maps_scraper.KnownSeen(set(), index)
+    feed = "https://www.google.com/maps/place/Cafe+Riche/data=!4m7!3m6!1s0x1:0x2!19sChIJW3qOrKI_WBQRa1pPPi0cH3s"
+    assert maps_scraper.is_seen(seen, feed)
+    assert asked == ["pid:ChIJW3qOrKI_WBQRa1pPPi0cH3s"]
+    index.close()
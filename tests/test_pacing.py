@@ -0,0 +1,27 @@
+import pytest
+
+from scraper.pacing import AdaptivePacer
+
+
+def test_success_shrinks_delay_down_to_floor():
+    p = AdaptivePacer("t", min_scale=0.5, step=0.2, log_every=0)
+    for _ in range(10):
+        p.success(latency=1.0)
+    assert p.scale == pytest.approx(0.5)
+    assert p.ok == 10
+
+
+def test_trouble_backs_off_multiplicatively_up_to_cap():
+    p = AdaptivePacer("t", max_scale=3.0, backoff=2.0)
+    p.trouble("timeout")
+    assert p.scale == pytest.approx(2.0)
+    p.success(latency=60.0)  # too slow counts as trouble
+    assert p.scale == pytest.approx(3.0)
+    assert p.trouble_counts == {"timeout": 1, "slow": 1}
+    assert "delay x3.00" in p.status()
+
+
+def test_delay_is_scaled_range():
+    p = AdaptivePacer("t")
+    p.scale = 0.5
+    assert all(0.5 <= p.delay(1.0, 2.0) <= 1.0 for _ in range(50))
@@ -0,0 +1,55 @@
+from scraper.page_state import CircuitBreaker, RunBlocked, classify_page, wait_for_page_state
+
+
+def test_breaker_escalates_pause_rotate_abort():
+    b = CircuitBreaker("t", trip_after=2, empty_streak=0, max_trips=3)
+    steps = []
+    for _ in range(3):
+        b.record("captcha")
+        assert b.blocked
+        assert b.action() == ""
+        b.record("captcha")
+        steps.append(b.action())
+    assert steps == ["pause", "rotate", "abort"]
+
+
+def test_breaker_resets_on_results_and_counts_empty_streaks():
+    b = CircuitBreaker("t", trip_after=2, empty_streak=3, max_trips=3)
+    b.record("consent")
+    b.record("results")
+    assert not b.blocked
+    b.record("consent")
+    assert b.action() == ""
+    for _ in range(3):
+        b.record("empty")
+    assert not b.blocked
+    assert b.action() == "pause"
+    assert "empty=3" in b.status()
+
+
+def test_breaker_counts_navigation_timeouts_like_empty_feeds():
+    b = CircuitBreaker("t", trip_after=1, empty_streak=2, max_trips=3)
+    b.record("timeout")
+    assert b.action() == ""
+    b.record("timeout")
+    assert not b.blocked
+    assert b.action() == "pause"
+    assert "timeout=2" in b.status()
+    assert RunBlocked("blocked", rows=7).rows == 7
+
+
+class StateDriver:
+    def __init__(self, states):
+        self.states = list(states)
+
+    def execute_script(self, script, *args):
+        if len(self.states) > 1:
+            return self.states.pop(0)
+        return self.states[0]
+
+
+def test_wait_for_page_state_polls_until_settled():
+    d = StateDriver(["loading", "loading", "captcha"])
+    assert wait_for_page_state(d, "div.card", "//h1", timeout=2, poll=0.01) == "captcha"
+    assert classify_page(StateDriver([None]), "div.card", "//h1") == "loading"
+    assert wait_for_page_state(StateDriver(["loading"]), "div.card", "//h1", timeout=0.05, poll=0.01) == "loading"
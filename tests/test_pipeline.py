@@ -0,0 +1,52 @@
+import json
+import time
+from types import SimpleNamespace
+
+import pipeline
+from db.job_queue import JobQueue, LeaseKeeper, open_queue
+
+
+def queue_args(url):
+    return SimpleNamespace(queue=url, worker_id="w1", lease_batch=5, stats_dir="", out_prefix="run")
+
+
+def test_category_that_found_nothing_is_completed(monkeypatch, tmp_path):
+    url = str(tmp_path / "q.sqlite")
+    open_queue(url).enqueue([("Cairo", "cafe"), ("Cairo", "ice rink")])
+
+    def run_location(args, location, categories_file, out_prefix, stats_out=""):
+        with open(stats_out, "w", encoding="utf-8") as f:
+            json.dump({"location": location, "categories": {"cafe": {"new": 4, "secs": 9.0}}}, f)
+        return False
+
+    monkeypatch.setattr(pipeline, "run_location", run_location)
+    pipeline.work_queue(queue_args(url))
+    assert open_queue(url).counts() == {"done": 2}
+
+
+
+
+def test_worker_that_lost_its_lease_leaves_the_jobs_alone(monkeypatch, tmp_path):
+    url = str(tmp_path / "q.sqlite")
+    q = open_queue(url)
+    q.enqueue([("Cairo", "cafe")])
+    held, calls = [], []
+
+    class QuickKeeper(LeaseKeeper):
+        def __init__(self, url, owner, job_ids):
+            super().__init__(url, owner, job_ids, ttl=0.3)
+            held.extend(job_ids)
+
+    def run_location(args, location, categories_file, out_prefix, stats_out=""):
+        q.heartbeat("w1", held, ttl=-1)  # the lease runs out mid-run...
+        assert len(q.lease("w2")) == 1  # ...and another worker picks the job up
+        time.sleep(0.3)
+        return False
+
+    monkeypatch.setattr("db.job_queue.LeaseKeeper", QuickKeeper)
+    monkeypatch.setattr(JobQueue, "complete", lambda self, *a, **kw: calls.append("complete"))
+    monkeypatch.setattr(JobQueue, "release", lambda self, *a, **kw: calls.append("release"))
+    monkeypatch.setattr(pipeline, "run_location", run_location)
+    pipeline.work_queue(queue_args(url))
+    assert calls == []
+    assert q.counts() == {"leased": 1}
@@ -0,0 +1,50 @@
+import random
+
+from scraper.proxy_pool import ProxyPool, attach_proxy, driver_proxy, load_proxies, report_proxy
+
+
+def test_load_proxies_skips_comments(tmp_path):
+    p = tmp_path / "proxies.txt"
+    p.write_text("# egress pool\nhttp://a:1\n\n  http://b:2  \n")
+    assert load_proxies(str(p)) == ["http://a:1", "http://b:2"]
+
+
+def test_pick_prefers_healthy_proxies():
+    random.seed(1)
+    pool = ProxyPool(["good", "bad"], cooldown=60, quarantine_after=100)
+    for _ in range(20):
+        pool.report("good", True, latency=1.0)
+        pool.report("bad", False)
+    picks = [pool.pick() for _ in range(200)]
+    assert picks.count("good") > 150
+
+
+def test_block_quarantines_with_growing_cooldown():
+    pool = ProxyPool(["a", "b"], cooldown=60, quarantine_after=3)
+    pool.report("a", False, blocked=True)
+    assert pool.quarantined("a")
+    assert all(pool.pick() == "b" for _ in range(20))
+    first = pool.stats["a"].until
+    pool.stats["a"].until = 0
+    pool.report("a", False, blocked=True)
+    assert pool.stats["a"].until - first > 50  # second bench is twice as long
+    pool.report("b", False)
+    pool.report("b", False)
+    assert not pool.quarantined("b")
+    pool.report("b", False)
+    assert pool.quarantined("b")
+    # Everything benched: still hands out the proxy that returns first.
+    assert pool.pick() in ("a", "b")
+
+
+def test_driver_attachment_routes_reports():
+    class D:
+        pass
+
+    pool = ProxyPool(["a"])
+    d = attach_proxy(D(), pool, "a")
+    assert driver_proxy(d) == "a"
+    report_proxy(d, True, latency=2.0)
+    report_proxy(object(), True)
+    assert pool.stats["a"].ok == 1 and pool.stats["a"].latency == 2.0
+    assert "a: leases=0 ok=1" in pool.summary()[0]
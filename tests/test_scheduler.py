@@ -0,0 +1,85 @@
+import json
+import time
+from types import SimpleNamespace
+
+from config import SCHED_ENRICH_SECS_PER_PLACE, SCHED_LOCATION_OVERHEAD_SECS, SCHED_PRIOR_NEW, SCHED_PRIOR_SECS
+from scheduler import JobStats, cmd_record, demand_from_rows, demand_names, plan_jobs, read_list
+
+DAY = 86400.0
+# A never-scraped combo in a fresh location: scrape, enrich its expected places, location overhead.
+ONE_JOB = SCHED_PRIOR_SECS + SCHED_PRIOR_NEW * SCHED_ENRICH_SECS_PER_PLACE + SCHED_LOCATION_OVERHEAD_SECS
+
+
+def test_read_list_skips_tier_comments(tmp_path):
+    p = tmp_path / "cities.txt"
+    p.write_text("# ── TIER 1 ──\nLondon, United Kingdom\n\nDubai, United Arab Emirates\n")
+    assert read_list(str(p)) == ["London, United Kingdom", "Dubai, United Arab Emirates"]
+
+
+def test_fresh_combos_rank_below_stale_productive_ones(tmp_path):
+    now = time.time()
+    stats = JobStats(str(tmp_path / "s.sqlite"))
+    stats.record("A", "cafe", new=200, secs=300, when=now - 60 * DAY)  # stale and productive
+    stats.record("B", "cafe", new=200, secs=300, when=now - 1 * DAY)  # just scraped
+    budget = 300 + 200 * SCHED_ENRICH_SECS_PER_PLACE + SCHED_LOCATION_OVERHEAD_SECS
+    plan = plan_jobs(["A", "B"], ["cafe"], stats, {}, budget_secs=budget, now=now)
+    assert [(j.location, j.category) for j in plan.jobs] == [("A", "cafe")]
+
+
+def test_budget_and_location_cap(tmp_path):
+    stats = JobStats(str(tmp_path / "s.sqlite"))
+    plan = plan_jobs(["A", "B", "C"], ["cafe", "bar"], stats, {}, budget_secs=10_000, max_locations=2)
+    assert len(plan.by_location()) == 2
+    assert plan.secs <= 10_000
+
+    tight = plan_jobs(["A", "B", "C"], ["cafe", "bar"], stats, {}, budget_secs=ONE_JOB + 50)
+    assert len(tight.jobs) == 1
+    assert tight.jobs[0].secs == SCHED_PRIOR_SECS + SCHED_PRIOR_NEW * SCHED_ENRICH_SECS_PER_PLACE
+
+
+def test_demand_pulls_in_unlisted_combo(tmp_path):
+    stats = JobStats(str(tmp_path / "s.sqlite"))
+    rows = [{"location": "McAllen, TX, USA", "category": "Dentist"}] * 3
+    demand = demand_from_rows(rows, ["A"], ["cafe"])
+    plan = plan_jobs(["A"], ["cafe"], stats, demand, budget_secs=ONE_JOB, names=demand_names(rows))
+    assert (plan.jobs[0].location, plan.jobs[0].category) == ("McAllen, TX, USA", "Dentist")
+    assert plan.jobs[0].demand == 3
+
+
+def test_demand_without_category_spreads_over_categories():
+    demand = demand_from_rows([{"location": "A", "category": ""}, {"location": "", "category": ""}], ["A"],
+                              ["cafe", "bar"])
+    assert demand == {("a", "cafe"): 1, ("a", "bar"): 1}
+
+
+def test_record_folds_run_stats_into_ewma(tmp_path):
+    db = str(tmp_path / "s.sqlite")
+    run = tmp_path / "run.json"
+    run.write_text(json.dumps({"location": "London, United Kingdom",
+                               "categories": {"cafe": {"new": 100, "secs": 200.0}}}))
+    cmd_record(SimpleNamespace(stats=db, run_stats=[str(run)]))
+    run.write_text(json.dumps({"location": "London, United Kingdom",
+                               "categories": {"cafe": {"new": 0, "secs": 100.0}}}))
+    cmd_record(SimpleNamespace(stats=db, run_stats=[str(run), str(tmp_path / "missing.json")]))
+
+    st = JobStats(db).get("london, united kingdom", "Cafe")
+    assert st["runs"] == 2
+    assert st["last_new"] == 0
+    assert st["ewma_new"] == 50.0
+    assert st["ewma_secs"] == 150.0
+
+
+def test_record_counts_scheduled_combos_without_an_entry_as_empty(tmp_path):
+    db = str(tmp_path / "s.sqlite")
+    run = tmp_path / "run.json"
+    run.write_text(json.dumps({"location": "A", "categories": {"cafe": {"new": 5, "secs": 60.0}},
+                               "scheduled": ["cafe", "ice rink"], "blocked": False}))
+    blocked = tmp_path / "blocked.json"
+    blocked.write_text(json.dumps({"location": "B", "categories": {}, "scheduled": ["ice rink"], "blocked": True}))
+    cmd_record(SimpleNamespace(stats=db, run_stats=[str(run), str(blocked)]))
+
+    stats = JobStats(db)
+    assert stats.get("A", "ice rink")["ewma_new"] == 0.0
+    assert stats.get("B", "ice rink") is None
+    plan = plan_jobs(["A"], ["cafe", "ice rink"], stats, {}, budget_secs=10_000)
+    assert "never scraped" not in {j.reason for j in plan.jobs}
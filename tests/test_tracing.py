@@ -0,0 +1,69 @@
+import json
+
+from scraper.tracing import Tracer, instrument_driver, percentile, worker_trace_path
+
+
+class Driver:
+    def __init__(self):
+        self.sent = []
+
+    def execute(self, driver_command, params=None):
+        self.sent.append(driver_command)
+        return {"value": None}
+
+
+def test_percentile_picks_nearest_rank():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([3, 1, 2], 0.5) == 2
+    assert percentile(list(range(1, 101)), 0.95) == 95
+
+
+def test_spans_roundtrips_and_summary(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    t = Tracer("test")
+    t.open(str(path))
+    d = instrument_driver(Driver(), t)
+    assert instrument_driver(d, t) is d
+
+    @t.wrap("extract_detail")
+    def extract(driver):
+        driver.execute("executeScript")
+        driver.execute("executeScript")
+
+    with t.category("cafes"):
+        with t.span("navigate"):
+            d.execute("get")
+        extract(d)
+        t.place_done("https://maps/place/A")
+        extract(d)
+        t.place_done("https://maps/place/B")
+    t.close()
+
+    recs = [json.loads(ln) for ln in path.read_text().splitlines()]
+    places = [r for r in recs if "place" in r]
+    assert [p["rt"] for p in places] == [3, 2]
+    assert {r["span"] for r in recs if "span" in r} == {"navigate", "extract_detail"}
+    assert all(r["cat"] == "cafes" for r in recs)
+    lines = t.summary()
+    assert any(ln.startswith("extract_detail: n=2") for ln in lines)
+    assert any(ln.startswith("[cafes] places=2") and "round trips/place=2" in ln for ln in lines)
+
+
+def test_nested_spans_charge_only_self_time(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("scraper.tracing.time.time", lambda: clock[0])
+    t = Tracer("test")
+    with t.span("scroll"):
+        clock[0] += 1.0
+        with t.span("scroll_step"):
+            clock[0] += 2.0
+            with t.span("jitter"):
+                clock[0] += 0.5
+        clock[0] += 1.0
+    assert t.durations == {"jitter": [0.5], "scroll_step": [2.0], "scroll": [2.0]}
+    assert sum(sum(v) for v in t.durations.values()) == clock[0]
+
+
+def test_worker_trace_path():
+    assert worker_trace_path("run/trace.jsonl", 2) == "run/trace.w2.jsonl"
+    assert worker_trace_path("trace", 0) == "trace.w0.jsonl"